@@ -2,24 +2,83 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import functools
 import re
 import sys
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 import boto3
 from botocore.config import Config as BotoConfig
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError, ProfileNotFound
 
 CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
 
 _REGION_RE = re.compile(r"^[a-z]{2}-[a-z]+-\d$")
 
+# The caches below (session_for_profile, get_client, sts_whoami) are process-wide and not locked:
+# fill them on the main thread (prewarm_profiles / warm_clients) before worker threads start, so
+# workers only read them. boto3 Session.client() itself is not thread-safe either.
+
+@functools.lru_cache(maxsize=None)
 def session_for_profile(profile: str) -> boto3.session.Session:
+    # one Session per profile per run, so get_client()'s cache (keyed on the session) is shared
     return boto3.Session(profile_name=profile)
 
+def _config_key(config: BotoConfig) -> Tuple[str, ...]:
+    """Value key for a BotoConfig (it compares by identity): separately built equal configs match."""
+    return tuple(repr(getattr(config, name, None)) for name in BotoConfig.OPTION_DEFAULTS)
+
+_client_cache: Dict[Tuple, object] = {}
+
+def get_client(session: boto3.session.Session, service: str, region: Optional[str] = None,
+               config: Optional[BotoConfig] = None):
+    """
+    Client per (session, service, region, config values), reused for the whole run.
+    Saves endpoint resolution/credential loading and keeps the urllib3 pool (and TLS) warm.
+    """
+    config = config or CFG
+    key = (session, service, region, _config_key(config))
+    client = _client_cache.get(key)
+    if client is None:
+        client = _client_cache[key] = session.client(service, region_name=region, config=config)
+    return client
+
+def with_pool_size(config: BotoConfig, max_pool_connections: int) -> BotoConfig:
+    """Copy of config with the urllib3 pool sized for the caller's concurrency."""
+    return config.merge(BotoConfig(max_pool_connections=max_pool_connections))
+
+def prewarm_profiles(profiles: List[str], warm: Callable[[boto3.session.Session], None]) -> None:
+    """
+    Build the Session for each profile, create its STS client (sts_whoami) and run warm(session)
+    (typically get_client calls) concurrently, one thread per profile: model loading / endpoint resolution overlap
+    across profiles, and no Session is ever shared between threads.
+    Missing profiles are skipped here; the caller's main loop reports them.
+    """
+    def _one(profile: str) -> None:
+        try:
+            sess = session_for_profile(profile)
+            get_client(sess, "sts", None, CFG)
+            warm(sess)
+        except ProfileNotFound:
+            pass
+        except BotoCoreError as e:
+            print(f"  ! prewarm {profile}: {e}", file=sys.stderr)
+
+    profiles = list(dict.fromkeys(profiles))
+    if not profiles:
+        return
+    with ThreadPoolExecutor(max_workers=len(profiles)) as ex:
+        list(ex.map(_one, profiles))
+
+# session -> (account_id, caller_arn); keyed on the Session, not its profile name, since sessions
+# sharing a name can carry different credentials (env vars, assumed roles)
+_whoami_cache: Dict[boto3.session.Session, Tuple[str, str]] = {}
+
 def sts_whoami(session: boto3.session.Session) -> Tuple[str, str]:
-    sts = session.client("sts", config=CFG)
-    me = sts.get_caller_identity()
-    return me["Account"], me["Arn"]
+    if session not in _whoami_cache:
+        me = get_client(session, "sts", None, CFG).get_caller_identity()
+        _whoami_cache[session] = (me["Account"], me["Arn"])
+    return _whoami_cache[session]
 
 def parse_regions_arg(regions_arg: str) -> List[str]:
     """
@@ -11,37 +11,41 @@ Common helpers for CloudFront reviews.
 No external deps besides boto3/botocore/stdlib.
 """
 
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, Iterator, Tuple, Optional, List
 import sys
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
-CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
+from scripts.common.aws_common import get_client
+
+CFG = BotoConfig(retries={"max_attempts": 10, "mode": "adaptive"}, max_pool_connections=50, tcp_keepalive=True)
 CF_NS = "AWS/CloudFront"
 
 # ---------- Clients ----------
-def _cf(session):
-    # CloudFront is global (no region)
-    return session.client("cloudfront", config=CFG)
+def _cf(session, config: Optional[BotoConfig] = None):
+    # CloudFront is global (no region); cached so worker threads share one client
+    return get_client(session, "cloudfront", None, config or CFG)
+
+def warm_client(session, config: Optional[BotoConfig] = None) -> None:
+    """Create the cached cloudfront client on the calling thread (Session.client() isn't thread-safe)."""
+    _cf(session, config)
 
 def _cw(session):
     # CloudFront metrics live in us-east-1 with Region=Global dimension
-    return session.client("cloudwatch", region_name="us-east-1", config=CFG)
+    return get_client(session, "cloudwatch", "us-east-1", CFG)
 
 # ---------- Distributions / Config ----------
-def list_all_distributions(session) -> List[Dict]:
-    """Return minimal info for all distributions in the account/profile."""
-    cf = _cf(session)
-    out: List[Dict] = []
-    marker = None
-    while True:
-        kwargs = {"MaxItems": "100"}
-        if marker:
-            kwargs["Marker"] = marker
-        resp = cf.list_distributions(**kwargs)
-        dist_list = resp.get("DistributionList", {})
-        for item in (dist_list.get("Items") or []):
-            out.append({
+def iter_distributions(session, config: Optional[BotoConfig] = None) -> Iterator[Dict]:
+    """
+    Yield minimal info per distribution, page by page (ListDistributions paginator).
+    The summary already embeds Origins / DefaultCacheBehavior / CacheBehaviors (same shapes as
+    in DistributionConfig), so those are kept and the config review needs no GetDistributionConfig.
+    """
+    cf = _cf(session, config)
+    paginator = cf.get_paginator("list_distributions")
+    for page in paginator.paginate(PaginationConfig={"PageSize": 100}):
+        for item in (page.get("DistributionList", {}).get("Items") or []):
+            yield {
                 "Id": item["Id"],
                 "DomainName": item.get("DomainName"),
                 "Enabled": item.get("Enabled", False),
@@ -49,15 +53,14 @@ def list_all_distributions(session) -> List[Dict]:
                 "ARN": item.get("ARN"),
                 "PriceClass": item.get("PriceClass"),
                 "WebACLId": item.get("WebACLId"),
-            })
-        if not dist_list.get("IsTruncated"):
-            break
-        marker = dist_list.get("NextMarker")
-    return out
+                "Origins": item.get("Origins"),
+                "DefaultCacheBehavior": item.get("DefaultCacheBehavior"),
+                "CacheBehaviors": item.get("CacheBehaviors"),
+            }
 
-def get_distribution_config(session, dist_id: str) -> Dict:
+def get_distribution_config(session, dist_id: str, config: Optional[BotoConfig] = None) -> Dict:
     """Return full DistributionConfig for a given distribution."""
-    cf = _cf(session)
+    cf = _cf(session, config)
     resp = cf.get_distribution_config(Id=dist_id)
     return resp.get("DistributionConfig", {})
 
@@ -77,23 +80,32 @@ def origin_oai_oac_flags(origin: Dict) -> Tuple[bool, bool, Optional[str]]:
     has_oac = bool(origin.get("OriginAccessControlId"))
     return has_oai, has_oac, otype
 
-def _cache_policy_config(session, policy_id: str, _cache: Dict[str, Dict]) -> Optional[Dict]:
-    """Fetch CachePolicyConfig by ID and memoize."""
-    if policy_id in _cache:
-        return _cache[policy_id]
+def fetch_cache_policy_config(session, policy_id: str, config: Optional[BotoConfig] = None) -> Optional[Dict]:
+    """GetCachePolicy -> CachePolicyConfig (None on error). Safe to call from worker threads."""
     try:
-        cf = _cf(session)
+        cf = _cf(session, config)
         resp = cf.get_cache_policy(Id=policy_id)
-        cfg = resp.get("CachePolicy", {}).get("CachePolicyConfig")
-        if cfg:
-            _cache[policy_id] = cfg
-        return cfg
+        return resp.get("CachePolicy", {}).get("CachePolicyConfig")
     except ClientError as e:
         code = e.response.get("Error", {}).get("Code", "Unknown")
         print(f"[cache-policy:{policy_id}] skip ({code})", file=sys.stderr)
         return None
 
-def analyze_behavior(session, behavior: Dict, cache_policies: Dict[str, Dict]) -> Dict:
+def behavior_cache_policy_ids(dist_cfg: Dict) -> List[str]:
+    """Distinct CachePolicyIds used by a DistributionConfig (default + additional behaviors)."""
+    behaviors = [dist_cfg.get("DefaultCacheBehavior") or {}]
+    behaviors.extend(dist_cfg.get("CacheBehaviors", {}).get("Items") or [])
+    return list(dict.fromkeys(b["CachePolicyId"] for b in behaviors if b.get("CachePolicyId")))
+
+def _cache_policy_config(session, policy_id: str, _cache: Dict[str, Optional[Dict]],
+                         config: Optional[BotoConfig] = None) -> Optional[Dict]:
+    """Fetch CachePolicyConfig by ID and memoize (failures too, so a denied policy is asked once)."""
+    if policy_id not in _cache:
+        _cache[policy_id] = fetch_cache_policy_config(session, policy_id, config)
+    return _cache[policy_id]
+
+def analyze_behavior(session, behavior: Dict, cache_policies: Dict[str, Optional[Dict]],
+                     config: Optional[BotoConfig] = None) -> Dict:
     """
     Normalize behavior into TTLs + cache key forwarding (queries/cookies),
     supporting both modern CachePolicy and legacy ForwardedValues.
@@ -115,7 +127,7 @@ def analyze_behavior(session, behavior: Dict, cache_policies: Dict[str, Dict]) -
     if policy_id:
         out["cache_policy_mode"] = "cache_policy"
         out["cache_policy_id"] = policy_id
-        cfg = _cache_policy_config(session, policy_id, cache_policies) or {}
+        cfg = _cache_policy_config(session, policy_id, cache_policies, config) or {}
 
         out["min_ttl"] = cfg.get("MinTTL")
         out["default_ttl"] = cfg.get("DefaultTTL")
@@ -4,6 +4,7 @@
 from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Sequence, Tuple
+import heapq
 import math
 from botocore.config import Config as BotoConfig
 
@@ -19,25 +20,33 @@ def window(days: int) -> Tuple[datetime, datetime]:
     return start, end
 
 # ----- Stats helpers -----
-def _percentile(sorted_series: List[float], p: float) -> Optional[float]:
-    if not sorted_series:
+def _percentile(series: Sequence[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile; only the ranks >= floor(k) are selected (heapq), no full sort."""
+    if not series:
         return None
-    k = (len(sorted_series) - 1) * (p / 100.0)
+    n = len(series)
+    k = (n - 1) * (p / 100.0)
     f = math.floor(k)
-    c = min(f + 1, len(sorted_series) - 1)
+    c = min(f + 1, n - 1)
+    tail = heapq.nlargest(n - f, series)  # descending: tail[-1] is rank f, tail[-2] rank f+1
     if f == c:
-        return sorted_series[f]
-    return sorted_series[f] + (sorted_series[c] - sorted_series[f]) * (k - f)
+        return tail[-1]
+    return tail[-1] + (tail[-2] - tail[-1]) * (k - f)
 
 def summarize(series: List[float]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
     if not series:
         return (None, None, None)
-    s = sorted(series)
-    avg = sum(s) / len(s)
-    p95 = _percentile(s, 95.0)
-    mx = s[-1]
+    avg = sum(series) / len(series)
+    p95 = _percentile(series, 95.0)
+    mx = max(series)
     return (avg, p95, mx)
 
+def avg_max(series: Sequence[float]) -> Tuple[Optional[float], Optional[float]]:
+    """(avg, max) without the sort summarize() needs for p95; sum()/max() run as C loops."""
+    if not series:
+        return (None, None)
+    return (sum(series) / len(series), max(series))
+
 # ----- CloudWatch fetch -----
 def get_metric_series(
     cw_client,
@@ -89,6 +98,54 @@ def get_metric_statistics_multi(
     resp = cw_client.get_metric_statistics(**params)
     return sorted(resp.get("Datapoints", []), key=lambda d: d["Timestamp"])
 
+def metric_data_query(
+    query_id: str,
+    namespace: str,
+    metric_name: str,
+    dimensions: List[Dict[str, str]],
+    period: int,
+    stat: str = "Average",
+) -> Dict:
+    """Build one GetMetricData MetricDataQueries entry (Id must start with a lowercase letter)."""
+    return {
+        "Id": query_id,
+        "MetricStat": {
+            "Metric": {"Namespace": namespace, "MetricName": metric_name, "Dimensions": dimensions},
+            "Period": period,
+            "Stat": stat,
+        },
+        "ReturnData": True,
+    }
+
+
+def batch_get_metric_data(
+    cw_client,
+    queries: Sequence[Dict],
+    start: datetime,
+    end: datetime,
+    batch_size: int = 500,
+) -> Dict[str, Tuple[List[datetime], List[float]]]:
+    """
+    Run MetricDataQueries through GetMetricData in chunks of batch_size (API max 500),
+    following NextToken. Returns Id -> (timestamps, values), ascending by time.
+    """
+    out: Dict[str, Tuple[List[datetime], List[float]]] = {q["Id"]: ([], []) for q in queries}
+    paginator = cw_client.get_paginator("get_metric_data")
+    for i in range(0, len(queries), batch_size):
+        chunk = list(queries[i:i + batch_size])
+        for page in paginator.paginate(
+            MetricDataQueries=chunk,
+            StartTime=start,
+            EndTime=end,
+            ScanBy="TimestampAscending",
+        ):
+            for r in page.get("MetricDataResults", []) or []:
+                ts, vals = out.setdefault(r["Id"], ([], []))
+                ts.extend(r.get("Timestamps", []) or [])
+                # botocore already parses Values (type double) to float: no per-element cast
+                vals.extend(r.get("Values", []) or [])
+    return out
+
 # ----- RDS helpers -----
 def rds_dim(db_instance_id: str) -> List[Dict[str, str]]:
     return [{"Name": "DBInstanceIdentifier", "Value": db_instance_id}]
@@ -3,18 +3,95 @@
 
 import csv
 import os
-from typing import List, Dict, Sequence
+from operator import attrgetter
+from typing import Any, Iterable, List, Dict, Sequence
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
+# large write buffer: rows are small, so flush in big chunks
+CSV_BUFFERING = 1 << 20
+
 def write_csv(path: str, rows: List[Dict], field_order: Sequence[str]) -> None:
+    """
+    Write dict rows in field_order; keys outside field_order are ignored and missing keys
+    are written empty (same output as DictWriter(extrasaction="ignore"), without its per-row checks).
+    """
+    ensure_dir(os.path.dirname(path))
+    fields = list(field_order)
+    with open(path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFERING) as f:
+        w = csv.writer(f)
+        w.writerow(fields)
+        w.writerows([r.get(k) for k in fields] for r in rows)
+
+def write_tuples(path: str, rows: Iterable[Sequence[Any]], field_order: Sequence[str]) -> None:
+    """Writer for rows that are already tuples in field_order (written as-is)."""
     ensure_dir(os.path.dirname(path))
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=list(field_order), extrasaction="ignore")
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+    with open(path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFERING) as f:
+        w = csv.writer(f)
+        w.writerow(list(field_order))
+        w.writerows(rows)
+
+def write_records(path: str, records: Iterable[Any], field_order: Sequence[str]) -> None:
+    """
+    Writer for attribute-based rows (dataclasses / NamedTuples): one attrgetter per file,
+    plain csv.writer rows (no per-row dict building or DictWriter key lookups).
+    """
+    ensure_dir(os.path.dirname(path))
+    fields = list(field_order)
+    getter = attrgetter(*fields)
+    with open(path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFERING) as f:
+        w = csv.writer(f)
+        w.writerow(fields)
+        if len(fields) == 1:
+            w.writerows((getter(r),) for r in records)
+        else:
+            w.writerows(getter(r) for r in records)
+
+class CsvStream:
+    """
+    Append-as-you-go CSV (merged multi-profile outputs): the file and header are created on the
+    first write, so an empty run leaves no file behind, and rows never have to be held in memory.
+    """
+
+    def __init__(self, path: str, field_order: Sequence[str]):
+        self.path = path
+        self.fields = list(field_order)
+        self.count = 0
+        self._fp = None
+        self._writer = None
+
+    def _w(self):
+        if self._writer is None:
+            ensure_dir(os.path.dirname(self.path))
+            self._fp = open(self.path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFERING)
+            self._writer = csv.writer(self._fp)
+            self._writer.writerow(self.fields)
+        return self._writer
+
+    def write_tuples(self, rows: List[Sequence[Any]]) -> None:
+        if rows:
+            self._w().writerows(rows)
+            self.count += len(rows)
+
+    def write_records(self, records: List[Any]) -> None:
+        if records:
+            getter = attrgetter(*self.fields)
+            if len(self.fields) == 1:
+                self._w().writerows((getter(r),) for r in records)
+            else:
+                self._w().writerows(getter(r) for r in records)
+            self.count += len(records)
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 def write_rows(path: str, rows: List[Dict]) -> None:
     """
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Iterator
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+@contextlib.contextmanager
+def queue_logging(level: int = logging.INFO) -> Iterator[None]:
+    """
+    Route all logging through a QueueHandler: worker threads only enqueue records and a single
+    QueueListener thread writes them to stderr (plain "%(message)s", same output as the old prints).
+    The listener is stopped (queue drained) on exit.
+    """
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(q, handler)
+
+    root = logging.getLogger()
+    prev_handlers, prev_level = root.handlers[:], root.level
+    root.handlers[:] = [logging.handlers.QueueHandler(q)]
+    root.setLevel(level)
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        root.handlers[:] = prev_handlers
+        root.setLevel(prev_level)
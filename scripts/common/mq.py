@@ -1,36 +1,56 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, Iterator, List
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
-CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
+from scripts.common.aws_common import get_client
 
-def list_brokers(session, region: str) -> List[Dict[str, Any]]:
-    """List Amazon MQ brokers (minimal fields)."""
-    mq = session.client("mq", region_name=region, config=CFG)
-    out: List[Dict[str, Any]] = []
+CFG = BotoConfig(retries={"max_attempts": 10, "mode": "adaptive"}, max_pool_connections=50, tcp_keepalive=True)
+
+def warm_clients(session, region: str, config: Optional[BotoConfig] = None) -> None:
+    """
+    Create (and cache) the clients the MQ helpers use for this region on the calling thread.
+    boto3 Session.client() is not thread-safe; the cached clients themselves are.
+    """
+    for service in ("mq", "logs", "backup", "ec2", "cloudwatch"):
+        get_client(session, service, region, config or CFG)
+
+def iter_brokers(session, region: str, config: Optional[BotoConfig] = None) -> Iterator[Dict[str, Any]]:
+    """Yield Amazon MQ broker summaries page by page (callers can start work before the last page)."""
+    mq = get_client(session, "mq", region, config or CFG)
     paginator = mq.get_paginator("list_brokers")
-    for page in paginator.paginate(PaginationConfig={"PageSize": 50}):
-        out.extend(page.get("BrokerSummaries", []) or [])
-    return out
+    for page in paginator.paginate(PaginationConfig={"PageSize": 100}):
+        yield from page.get("BrokerSummaries", []) or []
+
+def list_brokers(session, region: str, config: Optional[BotoConfig] = None) -> List[Dict[str, Any]]:
+    """List Amazon MQ brokers (minimal fields)."""
+    return list(iter_brokers(session, region, config))
 
-def describe_broker(session, region: str, broker_id: str) -> Optional[Dict[str, Any]]:
+def describe_broker(session, region: str, broker_id: str, config: Optional[BotoConfig] = None) -> Optional[Dict[str, Any]]:
     """Describe a single MQ broker safely."""
-    mq = session.client("mq", region_name=region, config=CFG)
+    mq = get_client(session, "mq", region, config or CFG)
     try:
         return mq.describe_broker(BrokerId=broker_id)
     except ClientError:
         return None
 
-def find_mq_log_group(session, region: str, broker_id: str, broker_name: Optional[str]) -> Tuple[Optional[str], Optional[int], bool]:
+def broker_details(session, region: str, summary: Dict[str, Any], config: Optional[BotoConfig] = None) -> Dict[str, Any]:
+    """Merge a list_brokers summary with describe_broker output."""
+    d = describe_broker(session, region, summary.get("BrokerId") or "", config) or {}
+    merged = dict(summary)
+    merged.update({k: v for k, v in d.items() if v is not None})
+    return merged
+
+def find_mq_log_group(session, region: str, broker_id: str, broker_name: Optional[str],
+                      config: Optional[BotoConfig] = None) -> Tuple[Optional[str], Optional[int], bool]:
     """
     Locate CloudWatch Logs group for this broker.
     Heuristics: groups starting with '/aws/amazonmq', prefer one containing broker_id, else broker_name.
     Returns: (group_name, retention_days or 0 if unlimited/undefined, enabled_flag)
     """
-    logs = session.client("logs", region_name=region, config=CFG)
+    logs = get_client(session, "logs", region, config or CFG)
     chosen_name: Optional[str] = None
     chosen_retention = 0
 
@@ -64,14 +84,15 @@ def find_mq_log_group(session, region: str, broker_id: str, broker_name: Optiona
         return (chosen_name, chosen_retention, True)
     return (None, None, False)
 
-def backup_recovery_points(session, region: str, resource_arn: str) -> Tuple[int, Optional[str]]:
+def backup_recovery_points(session, region: str, resource_arn: str,
+                           config: Optional[BotoConfig] = None) -> Tuple[int, Optional[str]]:
     """
     Count AWS Backup recovery points for the broker resource ARN.
     Returns: (count, latest_recovery_point_iso)  latest may be None if none exist.
 
     API: list_recovery_points_by_resource(ResourceArn=..., MaxResults=?, NextToken=?)
     """
-    bkp = session.client("backup", region_name=region, config=CFG)
+    bkp = get_client(session, "backup", region, config or CFG)
     count = 0
     latest_iso: Optional[str] = None
     token: Optional[str] = None
@@ -105,11 +126,11 @@ def backup_recovery_points(session, region: str, resource_arn: str) -> Tuple[int
 
     return (count, latest_iso)
 
-def any_flow_logs_enabled(session, region: str) -> bool:
+def any_flow_logs_enabled(session, region: str, config: Optional[BotoConfig] = None) -> bool:
     """
     Region-level indicator: return True if there exists at least one VPC Flow Logs resource in region.
     """
-    ec2 = session.client("ec2", region_name=region, config=CFG)
+    ec2 = get_client(session, "ec2", region, config or CFG)
     try:
         resp = ec2.describe_flow_logs(MaxResults=5)
         return bool(resp.get("FlowLogs"))
@@ -20,26 +20,96 @@ Amazon MQ FinOps Scan — DATA ONLY
 """
 
 import argparse
+import functools
+import logging
 import os
+import re
 import sys
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, NamedTuple, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 from collections import defaultdict
+from bisect import bisect_left, bisect_right
 
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, ProfileNotFound
 
-from scripts.common.aws_common import session_for_profile, sts_whoami
+from scripts.common.aws_common import get_client, prewarm_profiles, session_for_profile, sts_whoami, with_pool_size
 from scripts.common.regions import parse_regions_arg
-from scripts.common.csvio import write_csv
-from scripts.common.cloudwatch import get_metric_series, summarize, window
+from scripts.common.logsetup import LOG_LEVELS, queue_logging
+from scripts.common.csvio import CsvStream, write_csv, write_records
+from scripts.common.cloudwatch import (
+    avg_max, batch_get_metric_data, get_metric_series, metric_data_query, summarize, window
+)
 from scripts.common.mq import (
-    list_brokers, describe_broker, find_mq_log_group,
+    iter_brokers, broker_details, find_mq_log_group, warm_clients,
     backup_recovery_points, any_flow_logs_enabled
 )
 
-CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
+log = logging.getLogger(__name__)
+
+CFG = BotoConfig(retries={"max_attempts": 10, "mode": "adaptive"}, max_pool_connections=50, tcp_keepalive=True)
 CW_NS = "AWS/AmazonMQ"
+# I/O-bound workers (boto3 releases the GIL on sockets)
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 5)
+# broker states that emit CloudWatch metrics (CREATION_*/DELETION_IN_PROGRESS etc. are skipped)
+METRIC_STATES = frozenset({"RUNNING", "REBOOT_IN_PROGRESS", "CRITICAL_ACTION_REQUIRED"})
+# GetMetricData accepts up to 500 MetricDataQueries per request
+MAX_METRIC_BATCH = 500
+
+@dataclass(slots=True)
+class BrokerRow:
+    """One mq_finops_scan.csv row; field order == CSV column order."""
+    account_id: str
+    region: str
+    broker_arn: Optional[str]
+    broker_id: Optional[str]
+    broker_name: Optional[str]
+    engine_type: Optional[str]
+    engine_version: Optional[str]
+    host_instance_type: Optional[str]
+    deployment_mode: Optional[str]
+    broker_state: Optional[str]
+    auto_minor_version_upgrade: bool
+
+    avg_cpu_Xd: Optional[float]
+    max_cpu_Xd: Optional[float]
+    avg_connections_Xd: Optional[float]
+    msg_activity_Xd: Optional[float]
+    msg_count_avg: Optional[float]
+    msg_ready_avg: Optional[float]
+    publish_rate_avg: Optional[float]
+    ack_rate_avg: Optional[float]
+
+    logs_group_name: Optional[str]
+    logs_retention_days: Optional[int]
+    backup_recovery_points_count: int
+    backup_last_recovery_point_time: Optional[str]
+    flow_logs_enabled: bool
+
+    flag_idle_candidate: bool = False
+    flag_overprovisioned_candidate: bool = False
+    flag_single_az_attention: bool = False
+    flag_logs_retention_long: bool = False
+    flag_no_logs_detected: bool = False
+    flag_no_backup_detected: bool = False
+    flag_no_flowlogs_detected: bool = False
+
+    recommended_action: str = ""
+
+    created_time: Optional[str] = None
+    maintenance_window_start_time: Optional[str] = None
+    data_replication_mode: Optional[str] = None
+    publicly_accessible: Optional[bool] = None
+
+# CSV schemas (single source of truth for per-profile + combined outputs)
+_SCAN_FIELDS = tuple(f.name for f in fields(BrokerRow))
+_READINESS_FIELDS = ("account_id","region","cloudwatch_access_ok","logs_access_ok","backup_access_ok","ce_access_ok","notes")
+_NODE_FIELDS = ("region","broker_id","broker_name","node","cpu_avg_pct","rabbitmq_mem_used_avg","network_in_avg_bps","network_out_avg_bps")
+
+# ".xlarge"/".2xlarge"/".4xlarge" or m5./m6g./m6i. families
+_LARGE_HOST_RE = re.compile(r"\.[24]?xlarge|m5\.|m6[gi]\.")
 
 # ---------------------- Helpers ---------------------- #
 def safe_series(cw, metric: str, dimensions: List[Dict[str, str]], start, end, period: int, stat="Average"):
@@ -47,9 +117,10 @@ def safe_series(cw, metric: str, dimensions: List[Dict[str, str]], start, end, p
         return get_metric_series(cw, CW_NS, metric, dimensions, start, end, period, stat=stat)
     except ClientError as e:
         code = e.response.get("Error", {}).get("Code", "")
-        print(f"    [metric:{metric}] skip ({code})", file=sys.stderr)
+        log.warning(f"    [metric:{metric}] skip ({code})")
         return []
 
+@functools.lru_cache(maxsize=32)
 def effective_period(days: int, requested: int) -> int:
     total_seconds = days * 86400
     raw = (total_seconds + 1440 - 1) // 1440
@@ -57,22 +128,22 @@ def effective_period(days: int, requested: int) -> int:
         raw = ((raw + 59) // 60) * 60
     return max(requested, raw)
 
-def pick_cpu_metric(engine_type: str) -> str:
-    et = (engine_type or "").lower()
-    return "SystemCpuUtilization" if "rabbit" in et else "CpuUtilization"
+class EngineSpec(NamedTuple):
+    """Per-engine CloudWatch metric names (resolved once per broker)."""
+    cpu: str
+    conn: str
+    msg: Tuple[Optional[str], Optional[str]]
+    pub: Tuple[Optional[str], Optional[str]]
 
-def pick_conn_metric(engine_type: str) -> str:
-    et = (engine_type or "").lower()
-    return "ConnectionCount" if "rabbit" in et else "CurrentConnectionsCount"
+RABBIT_SPEC = EngineSpec(cpu="SystemCpuUtilization", conn="ConnectionCount",
+                         msg=("MessageCount", "MessageReadyCount"), pub=("PublishRate", "AckRate"))
+AMQ_SPEC = EngineSpec(cpu="CpuUtilization", conn="CurrentConnectionsCount",
+                      msg=("EnqueueCount", "DequeueCount"), pub=(None, None))
 
-def message_activity_metric_pair(engine_type: str) -> Tuple[Optional[str], Optional[str]]:
-    et = (engine_type or "").lower()
-    return ("MessageCount", "MessageReadyCount") if "rabbit" in et else ("EnqueueCount", "DequeueCount")
-
-def publish_consume_metrics(engine_type: str) -> Tuple[Optional[str], Optional[str]]:
-    et = (engine_type or "").lower()
-    return ("PublishRate", "AckRate") if "rabbit" in et else (None, None)
+def resolve_engine(engine_type: Optional[str]) -> EngineSpec:
+    return RABBIT_SPEC if "rabbit" in (engine_type or "").lower() else AMQ_SPEC
 
+@functools.lru_cache(maxsize=None)
 def discover_dims_for_metric(cw_client, metric_name: str, broker_id: str, broker_name: Optional[str]) -> List[Dict[str, str]]:
     """
     מגלה סט Dimensions תקף *למטריקה הספציפית* ברמת Broker.
@@ -103,6 +174,60 @@ def get_stat_with_fallback(cw, metric: str, dims: List[Dict[str, str]], start, e
     a2, p95_2, mx2 = summarize(s_max)
     return a2, p95_2, mx2
 
+def resolve_dims(cw, metric: Optional[str], broker_id: str, broker_name: Optional[str],
+                 fallback_dims: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Dimensions for a broker-level metric; fallback_dims (read-only) when discovery finds nothing."""
+    if not metric:
+        return []
+    return discover_dims_for_metric(cw, metric, broker_id, broker_name) or fallback_dims
+
+def safe_metric_data(cw, queries: List[Dict], start, end, batch_size: int = MAX_METRIC_BATCH) -> Dict[str, List[float]]:
+    """
+    GetMetricData for all queries (chunks of batch_size); Id -> values, empty on error.
+    Series are ascending by time, so points outside [start, end] are cut with two bisects.
+    """
+    if not queries:
+        return {}
+    try:
+        return {qid: vals[bisect_left(ts, start):bisect_right(ts, end)]
+                for qid, (ts, vals) in batch_get_metric_data(cw, queries, start, end, batch_size).items()}
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code", "")
+        log.warning(f"    [metric-data:{len(queries)} queries] skip ({code})")
+        return {}
+
+def with_stat(query: Dict, stat: str) -> Dict:
+    q = dict(query)
+    q["MetricStat"] = dict(query["MetricStat"], Stat=stat)
+    return q
+
+def fill_broker_metrics(cw, pending: List[Tuple[BrokerRow, Dict[str, str]]], queries: List[Dict], start, end,
+                        batch_size: int = MAX_METRIC_BATCH) -> None:
+    """
+    One batched fetch for every broker metric in a region: Average first, then Maximum
+    only for the series that came back empty (same fallback as get_stat_with_fallback).
+    CPU avg and max come from the same series.
+    """
+    series = safe_metric_data(cw, queries, start, end, batch_size)
+    empty = [q for q in queries if not series.get(q["Id"])]
+    if empty:
+        series.update(safe_metric_data(cw, [with_stat(q, "Maximum") for q in empty], start, end, batch_size))
+
+    # summaries computed once per series id (column-wise over the whole region), then
+    # scattered onto the rows; max() only for the CPU series, the only ones that need it
+    cpu_ids = {ids["avg_cpu_Xd"] for _, ids in pending if "avg_cpu_Xd" in ids}
+    avgs = {qid: sum(vals) / len(vals) for qid, vals in series.items() if vals and qid not in cpu_ids}
+    cpu = {qid: avg_max(series.get(qid) or []) for qid in cpu_ids}
+
+    for row, ids in pending:
+        for field, qid in ids.items():
+            setattr(row, field, avgs.get(qid))
+        if "avg_cpu_Xd" in ids:
+            row.avg_cpu_Xd, row.max_cpu_Xd = cpu[ids["avg_cpu_Xd"]]
+        val1 = row.msg_count_avg or 0.0
+        val2 = row.msg_ready_avg or 0.0
+        row.msg_activity_Xd = (val1 + val2) if (val1 or val2) else 0.0
+
 def compute_flags(avg_cpu: Optional[float], avg_conn: Optional[float], msg_signal: Optional[float],
                   host_type: Optional[str], deployment_mode: Optional[str],
                   logs_retention_days: Optional[int],
@@ -115,7 +240,7 @@ def compute_flags(avg_cpu: Optional[float], avg_conn: Optional[float], msg_signa
     host = (host_type or "").lower()
 
     flag_idle_candidate = (cpu < 5.0 and conn < 1.0 and abs(msg) < 1e-6)
-    large_host = (".xlarge" in host) or (".2xlarge" in host) or (".4xlarge" in host) or ("m5." in host) or ("m6g." in host) or ("m6i." in host)
+    large_host = bool(_LARGE_HOST_RE.search(host))
     flag_overprovisioned_candidate = (cpu < 15.0 and large_host)
 
     flag_single_az_attention = (deployment_mode or "").lower().startswith("single")
@@ -151,6 +276,21 @@ def recommend_action(flags: Dict[str, bool], logs_enabled: bool=False) -> str:
         recs.append("Consider enabling VPC Flow Logs (optional)")
     return "; ".join(recs) if recs else ""
 
+def apply_flags(rows: List[BrokerRow]) -> None:
+    """
+    Single pass over the collected scan rows: fills flag_* + recommended_action in place.
+    Runs after collection so the per-broker I/O loop stays free of decision logic.
+    """
+    for row in rows:
+        logs_enabled = bool(row.logs_group_name)
+        flags = compute_flags(row.avg_cpu_Xd, row.avg_connections_Xd, row.msg_activity_Xd,
+                              row.host_instance_type, row.deployment_mode,
+                              row.logs_retention_days, logs_enabled,
+                              row.backup_recovery_points_count or 0, bool(row.flow_logs_enabled))
+        for name, value in flags.items():
+            setattr(row, name, value)
+        row.recommended_action = recommend_action(flags, logs_enabled=logs_enabled)
+
 # ---------------------- Per-Node helpers ---------------------- #
 def list_node_dims(cw_client, metric_name: str, broker_id: str, broker_name: Optional[str]) -> List[List[Dict[str, str]]]:
     """
@@ -239,211 +379,221 @@ def collect_nodes(cw, broker_id: str, broker_name: Optional[str], start, end, ef
     return rows, agg
 
 # ---------------------- Collector (Broker-level) ---------------------- #
-def collect_profile(sess, profile: str, acct_id: str, regions: List[str], days: int, period: int, want_per_node: bool) -> Tuple[List[Dict], List[Dict], List[Dict]]:
-    scan_rows: List[Dict] = []
-    readiness_rows: List[Dict] = []
-    nodes_rows_all: List[Dict] = []
-    start, end = window(days)
+def collect_broker(sess, cw, acct_id: str, region: str, br: Dict,
+                   start, end, effp: int, want_per_node: bool, side: ThreadPoolExecutor, cfg: BotoConfig = CFG
+                   ) -> Tuple[BrokerRow, List[Tuple[str, str, List[Dict[str, str]]]], List[Dict]]:
+    """
+    All per-broker I/O (describe, logs, dims discovery, backups, optional per-node metrics).
+    Runs in a worker thread; returns (row, [(field, metric, dims)], node_rows).
+    The log-group and backup lookups only need the list_brokers summary, so they run on the
+    side pool while this thread does describe + dims discovery (side tasks never wait on anything).
+    """
+    broker_id = br.get("BrokerId")
+    broker_name = br.get("BrokerName")
+    fut_logs = side.submit(find_mq_log_group, sess, region, broker_id or "", broker_name, cfg)
+    fut_bkp = side.submit(backup_recovery_points, sess, region, br["BrokerArn"], cfg) if br.get("BrokerArn") else None
+    d = broker_details(sess, region, br, cfg)
+
+    engine_type = d.get("EngineType")
+    engine_version = d.get("EngineVersion")
+    instance_type = d.get("HostInstanceType")
+    deploy_mode = d.get("DeploymentMode")
+    state = d.get("BrokerState")
+    auto_minor = bool(d.get("AutoMinorVersionUpgrade"))
+    broker_arn = d.get("BrokerArn")
+
+    created_time = None
+    if d.get("Created"):
+        try:
+            created_time = d["Created"].replace(microsecond=0).isoformat()
+        except Exception:
+            pass
+    maint_start = d.get("MaintenanceWindowStartTime")
+    data_replication_mode = d.get("DataReplicationMode")
+    publicly_accessible = d.get("PubliclyAccessible")
+
+    # --- Metrics (per-broker): only resolve dims here; values are fetched once per region --- #
+    # brokers that are being created/deleted/failed have no series: no dims lookups, no queries
+    want_metrics = state is None or state in METRIC_STATES
+    metrics: List[Tuple[str, str, List[Dict[str, str]]]] = []
+    if want_metrics:
+        spec = resolve_engine(engine_type)
+        cpu_dims = discover_dims_for_metric(cw, spec.cpu, broker_id or "", broker_name)
+        plan = (
+            ("avg_cpu_Xd", spec.cpu, cpu_dims),
+            ("avg_connections_Xd", spec.conn, None),
+            ("msg_count_avg", spec.msg[0], None),
+            ("msg_ready_avg", spec.msg[1], None),
+            ("publish_rate_avg", spec.pub[0], None),
+            ("ack_rate_avg", spec.pub[1], None),
+        )
+        for field, metric, dims in plan:
+            if dims is None:
+                dims = resolve_dims(cw, metric, broker_id or "", broker_name, cpu_dims)
+            if metric and dims:
+                metrics.append((field, metric, dims))
+
+    # Logs group / backup counts (side pool)
+    lg_name, lg_retention, lg_enabled = fut_logs.result()
+    bkp_count, bkp_latest = (0, None)
+    if fut_bkp is not None:
+        bkp_count, bkp_latest = fut_bkp.result()
+    elif broker_arn:
+        bkp_count, bkp_latest = backup_recovery_points(sess, region, broker_arn, cfg)
+
+    row = BrokerRow(
+        account_id=acct_id,
+        region=region,
+        broker_arn=broker_arn,
+        broker_id=broker_id,
+        broker_name=broker_name,
+        engine_type=engine_type,
+        engine_version=engine_version,
+        host_instance_type=instance_type,
+        deployment_mode=deploy_mode,
+        broker_state=state,
+        auto_minor_version_upgrade=auto_minor,
+
+        avg_cpu_Xd=None,
+        max_cpu_Xd=None,
+        avg_connections_Xd=None,
+        msg_activity_Xd=None,
+        msg_count_avg=None,
+        msg_ready_avg=None,
+        publish_rate_avg=None,
+        ack_rate_avg=None,
+
+        logs_group_name=lg_name,
+        logs_retention_days=lg_retention,
+        backup_recovery_points_count=bkp_count,
+        backup_last_recovery_point_time=bkp_latest,
+        flow_logs_enabled=False,  # region-level, filled in by collect_profile
+
+        created_time=created_time,
+        maintenance_window_start_time=str(maint_start) if maint_start else None,
+        data_replication_mode=data_replication_mode,
+        publicly_accessible=publicly_accessible,
+    )
 
-    for region in regions:
-        cw   = sess.client("cloudwatch", region_name=region, config=CFG)
-        logs = sess.client("logs",       region_name=region, config=CFG)
+    # --- Per-node (optional) --- #
+    node_rows: List[Dict] = []
+    if want_per_node and want_metrics:
+        node_rows, node_agg = collect_nodes(cw, broker_id or "", broker_name, start, end, effp)
+        for r in node_rows:
+            r["region"] = region
+            r["broker_id"] = broker_id
+            r["broker_name"] = broker_name
 
-        # Readiness probes (coarse)
-        cloudwatch_ok = True
-        logs_ok = True
-        backup_ok = True
-        ce_ok = True
-        notes: List[str] = []
+    return row, metrics, node_rows
 
-        try:
-            cw.list_metrics(Namespace=CW_NS)
-        except ClientError as e:
-            cloudwatch_ok = False
-            notes.append(f"CW:{e.response.get('Error', {}).get('Code')}")
-        try:
-            logs.describe_log_groups(logGroupNamePrefix="/aws/amazonmq", limit=1)
-        except ClientError as e:
-            logs_ok = False
-            notes.append(f"LOGS:{e.response.get('Error', {}).get('Code')}")
-        try:
-            bkp = sess.client("backup", region_name=region, config=CFG)
-            bkp.list_backup_vaults(MaxResults=1)
-        except ClientError as e:
-            backup_ok = False
-            notes.append(f"BKP:{e.response.get('Error', {}).get('Code')}")
-
-        readiness_rows.append(dict(
-            account_id=acct_id, region=region,
-            cloudwatch_access_ok=cloudwatch_ok,
-            logs_access_ok=logs_ok,
-            backup_access_ok=backup_ok,
-            ce_access_ok=ce_ok,
-            notes=";".join(notes) if notes else ""
-        ))
+def probe_region(sess, acct_id: str, region: str, cfg: BotoConfig = CFG) -> Dict:
+    """Readiness probes (coarse) for one region; returns the mq_finops_readiness.csv row."""
+    cw   = get_client(sess, "cloudwatch", region, cfg)
+    logs = get_client(sess, "logs",       region, cfg)
 
-        flowlogs_enabled = any_flow_logs_enabled(sess, region)
+    cloudwatch_ok = True
+    logs_ok = True
+    backup_ok = True
+    ce_ok = True
+    notes: List[str] = []
 
-        try:
-            brokers = list_brokers(sess, region)
-        except ClientError as e:
-            print(f"[{profile}/{region}] list_brokers error: {e}", file=sys.stderr)
-            continue
-
-        for br in brokers:
-            broker_id = br.get("BrokerId")
-            broker_name = br.get("BrokerName")
-            d = describe_broker(sess, region, broker_id) or {}
-
-            engine_type = d.get("EngineType") or br.get("EngineType")
-            engine_version = d.get("EngineVersion") or br.get("EngineVersion")
-            instance_type = d.get("HostInstanceType") or br.get("HostInstanceType")
-            deploy_mode = d.get("DeploymentMode") or br.get("DeploymentMode")
-            state = d.get("BrokerState") or br.get("BrokerState")
-            auto_minor = bool(d.get("AutoMinorVersionUpgrade"))
-            broker_arn = d.get("BrokerArn") or br.get("BrokerArn")
-
-            created_time = None
-            if d.get("Created"):
-                try:
-                    created_time = d["Created"].replace(microsecond=0).isoformat()
-                except Exception:
-                    pass
-            maint_start = d.get("MaintenanceWindowStartTime")
-            data_replication_mode = d.get("DataReplicationMode")
-            publicly_accessible = d.get("PubliclyAccessible")
-
-            # Logs group
-            lg_name, lg_retention, lg_enabled = find_mq_log_group(sess, region, broker_id or "", broker_name)
-
-            effp = effective_period(days, period)
-
-            # --- Metrics (per-broker) --- #
-            cpu_metric = pick_cpu_metric(engine_type)
-            conn_metric = pick_conn_metric(engine_type)
-            m1, m2 = message_activity_metric_pair(engine_type)
-            pub_metric, ack_metric = publish_consume_metrics(engine_type)
-
-            avg_cpu = max_cpu = avg_conn = None
-            msg_signal = None
-            msg_count_avg = msg_ready_avg = None
-            publish_rate_avg = ack_rate_avg = None
-
-            # CPU
-            cpu_dims = discover_dims_for_metric(cw, cpu_metric, broker_id or "", broker_name)
-            if cpu_dims:
-                a_cpu, p95_cpu, mx_cpu = get_stat_with_fallback(cw, cpu_metric, cpu_dims, start, end, effp)
-                avg_cpu, max_cpu = a_cpu, mx_cpu
-
-            # Connections
-            conn_dims = discover_dims_for_metric(cw, conn_metric, broker_id or "", broker_name)
-            if not conn_dims and cpu_dims:
-                conn_dims = cpu_dims[:]
-            if conn_dims:
-                a_conn, _, _ = get_stat_with_fallback(cw, conn_metric, conn_dims, start, end, effp)
-                avg_conn = a_conn
-
-            # Message activity aggregates
-            val1 = val2 = 0.0
-            if m1:
-                m1_dims = discover_dims_for_metric(cw, m1, broker_id or "", broker_name)
-                if not m1_dims and cpu_dims:
-                    m1_dims = cpu_dims[:]
-                if m1_dims:
-                    v1, _, _ = get_stat_with_fallback(cw, m1, m1_dims, start, end, effp)
-                    msg_count_avg = v1
-                    val1 = v1 or 0.0
-
-            if m2:
-                m2_dims = discover_dims_for_metric(cw, m2, broker_id or "", broker_name)
-                if not m2_dims and cpu_dims:
-                    m2_dims = cpu_dims[:]
-                if m2_dims:
-                    v2, _, _ = get_stat_with_fallback(cw, m2, m2_dims, start, end, effp)
-                    msg_ready_avg = v2
-                    val2 = v2 or 0.0
-
-            msg_signal = (val1 + val2) if (val1 or val2) else 0.0
-
-            # Publish / Ack rates
-            if pub_metric:
-                pub_dims = discover_dims_for_metric(cw, pub_metric, broker_id or "", broker_name)
-                if not pub_dims and cpu_dims:
-                    pub_dims = cpu_dims[:]
-                if pub_dims:
-                    v, _, _ = get_stat_with_fallback(cw, pub_metric, pub_dims, start, end, effp)
-                    publish_rate_avg = v
-
-            if ack_metric:
-                ack_dims = discover_dims_for_metric(cw, ack_metric, broker_id or "", broker_name)
-                if not ack_dims and cpu_dims:
-                    ack_dims = cpu_dims[:]
-                if ack_dims:
-                    v, _, _ = get_stat_with_fallback(cw, ack_metric, ack_dims, start, end, effp)
-                    ack_rate_avg = v
-
-            # Backup counts
-            bkp_count, bkp_latest = (0, None)
-            if broker_arn:
-                bkp_count, bkp_latest = backup_recovery_points(sess, region, broker_arn)
-
-            flags = compute_flags(avg_cpu, avg_conn, msg_signal, instance_type, deploy_mode,
-                                  lg_retention, bool(lg_name), bkp_count, flowlogs_enabled)
-            rec = recommend_action(flags, logs_enabled=bool(lg_name))
-
-            row = dict(
-                account_id=acct_id,
-                region=region,
-                broker_arn=broker_arn,
-                broker_id=broker_id,
-                broker_name=broker_name,
-                engine_type=engine_type,
-                engine_version=engine_version,
-                host_instance_type=instance_type,
-                deployment_mode=deploy_mode,
-                broker_state=state,
-                auto_minor_version_upgrade=auto_minor,
-
-                avg_cpu_Xd=avg_cpu,
-                max_cpu_Xd=max_cpu,
-                avg_connections_Xd=avg_conn,
-                msg_activity_Xd=msg_signal,
-                msg_count_avg=msg_count_avg,
-                msg_ready_avg=msg_ready_avg,
-                publish_rate_avg=publish_rate_avg,
-                ack_rate_avg=ack_rate_avg,
-
-                logs_group_name=lg_name,
-                logs_retention_days=lg_retention,
-                backup_recovery_points_count=bkp_count,
-                backup_last_recovery_point_time=bkp_latest,
-                flow_logs_enabled=flowlogs_enabled,
-
-                flag_idle_candidate=flags["flag_idle_candidate"],
-                flag_overprovisioned_candidate=flags["flag_overprovisioned_candidate"],
-                flag_single_az_attention=flags["flag_single_az_attention"],
-                flag_logs_retention_long=flags["flag_logs_retention_long"],
-                flag_no_logs_detected=flags["flag_no_logs_detected"],
-                flag_no_backup_detected=flags["flag_no_backup_detected"],
-                flag_no_flowlogs_detected=flags["flag_no_flowlogs_detected"],
-
-                recommended_action=rec,
-                created_time=created_time,
-                maintenance_window_start_time=str(maint_start) if maint_start else None,
-                data_replication_mode=data_replication_mode,
-                publicly_accessible=publicly_accessible,
-            )
-            scan_rows.append(row)
-
-            # --- Per-node (optional) --- #
-            if want_per_node:
-                node_rows, node_agg = collect_nodes(cw, broker_id or "", broker_name, start, end, effp)
-                for r in node_rows:
-                    r["region"] = region
-                    r["broker_id"] = broker_id
-                    r["broker_name"] = broker_name
+    try:
+        cw.list_metrics(Namespace=CW_NS)
+    except ClientError as e:
+        cloudwatch_ok = False
+        notes.append(f"CW:{e.response.get('Error', {}).get('Code')}")
+    try:
+        logs.describe_log_groups(logGroupNamePrefix="/aws/amazonmq", limit=1)
+    except ClientError as e:
+        logs_ok = False
+        notes.append(f"LOGS:{e.response.get('Error', {}).get('Code')}")
+    try:
+        bkp = get_client(sess, "backup", region, cfg)
+        bkp.list_backup_vaults(MaxResults=1)
+    except ClientError as e:
+        backup_ok = False
+        notes.append(f"BKP:{e.response.get('Error', {}).get('Code')}")
+
+    return dict(
+        account_id=acct_id, region=region,
+        cloudwatch_access_ok=cloudwatch_ok,
+        logs_access_ok=logs_ok,
+        backup_access_ok=backup_ok,
+        ce_access_ok=ce_ok,
+        notes=";".join(notes) if notes else ""
+    )
+
+def list_region_brokers(sess, profile: str, region: str, cfg: BotoConfig = CFG) -> List[Dict]:
+    try:
+        return list(iter_brokers(sess, region, cfg))
+    except ClientError as e:
+        log.warning(f"[{profile}/{region}] list_brokers error: {e}")
+        return []
+
+def collect_profile(sess, profile: str, acct_id: str, regions: List[str], days: int, period: int, want_per_node: bool,
+                    max_workers: int = DEFAULT_MAX_WORKERS, cfg: BotoConfig = CFG,
+                    metric_batch_size: int = MAX_METRIC_BATCH
+                    ) -> Tuple[List[BrokerRow], List[Dict], List[Dict]]:
+    """
+    One pool for the whole profile (not one per region): region probes/listings and every
+    (region, broker) task share the workers, so many small regions keep the pool busy.
+    Output order is still regions as given, brokers in list order.
+    """
+    scan_rows: List[BrokerRow] = []
+    nodes_rows_all: List[Dict] = []
+    start, end = window(days)
+    effp = effective_period(days, period)
+
+    # Session.client() isn't thread-safe: every client the tasks use is created here first
+    for region in regions:
+        warm_clients(sess, region, cfg)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex, ThreadPoolExecutor(max_workers=max_workers) as side:
+        probes = [ex.submit(probe_region, sess, acct_id, region, cfg) for region in regions]
+        listings = {ex.submit(list_region_brokers, sess, profile, region, cfg): region for region in regions}
+
+        # brokers are queued as soon as their region's listing is in, whichever region finishes first
+        broker_futs: Dict[str, List[Future]] = {}
+        flowlog_futs: Dict[str, Future] = {}
+        for fut in as_completed(listings):
+            region = listings[fut]
+            brokers = fut.result()
+            if not brokers:
+                # list_brokers came back empty: nothing else to ask this region
+                continue
+            cw = get_client(sess, "cloudwatch", region, cfg)
+            flowlog_futs[region] = ex.submit(any_flow_logs_enabled, sess, region, cfg)
+            broker_futs[region] = [
+                ex.submit(collect_broker, sess, cw, acct_id, region, br, start, end, effp, want_per_node, side, cfg)
+                for br in brokers
+            ]
+
+        fills: List[Future] = []
+        for region in regions:
+            if region not in broker_futs:
+                continue
+            queries: List[Dict] = []
+            pending: List[Tuple[BrokerRow, Dict[str, str]]] = []
+            flowlogs_enabled = flowlog_futs[region].result()
+            for row, metrics, node_rows in (f.result() for f in broker_futs[region]):
+                row.flow_logs_enabled = flowlogs_enabled
+                metric_ids: Dict[str, str] = {}
+                for field, metric, dims in metrics:
+                    qid = f"m{len(queries)}"
+                    queries.append(metric_data_query(qid, CW_NS, metric, dims, effp))
+                    metric_ids[field] = qid
+                scan_rows.append(row)
+                pending.append((row, metric_ids))
                 nodes_rows_all.extend(node_rows)
+            # each region's GetMetricData batch runs on the pool; rows are disjoint per region
+            fills.append(ex.submit(fill_broker_metrics, get_client(sess, "cloudwatch", region, cfg),
+                                   pending, queries, start, end, metric_batch_size))
 
+        readiness_rows = [f.result() for f in probes]
+        for f in fills:
+            f.result()
+
+    apply_flags(scan_rows)
     return scan_rows, readiness_rows, nodes_rows_all
 
 # ---------------------- CLI & Main ---------------------- #
@@ -455,95 +605,97 @@ def parse_args():
     p.add_argument("--period", type=int, default=300, help="CloudWatch period seconds (>=60; default 300)")
     p.add_argument("--outdir", default=None, help="Output dir (default: outputs/amazon_mq_finops_<timestamp>)")
     p.add_argument("--per-node", action="store_true", help="Collect per-node metrics and write mq_nodes_*.csv")
-    return p.parse_args()
+    p.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                   help=f"Concurrent workers per profile, shared by all regions (default {DEFAULT_MAX_WORKERS})")
+    p.add_argument("--max-pool-connections", type=int, default=None,
+                   help="urllib3 pool size per client (default: max(2 * max-workers, 50))")
+    p.add_argument("--metric-batch-size", type=int, default=MAX_METRIC_BATCH,
+                   help=f"MetricDataQueries per GetMetricData request (1-{MAX_METRIC_BATCH}; default {MAX_METRIC_BATCH}). "
+                        "Lower it if the account's GetMetricData quota throttles")
+    p.add_argument("--log-level", default="INFO", choices=LOG_LEVELS,
+                   help="WARNING hides progress lines and keeps skips/errors")
+    args = p.parse_args()
+    if args.max_workers < 1:
+        p.error("--max-workers must be at least 1")
+    if not 1 <= args.metric_batch_size <= MAX_METRIC_BATCH:
+        p.error(f"--metric-batch-size must be between 1 and {MAX_METRIC_BATCH}")
+    return args
 
 def main():
     args = parse_args()
+    logging.getLogger().setLevel(args.log_level)
     try:
         regions = parse_regions_arg(args.regions)
     except ValueError as e:
-        print(f"Error: {e}", file=sys.stderr)
+        log.warning(f"Error: {e}")
         return 2
 
     eff_period = effective_period(args.days, args.period)
+    # broker workers + their side-pool lookups can be in flight at the same time
+    cfg = with_pool_size(CFG, args.max_pool_connections or max(2 * args.max_workers, 50))
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     outdir = args.outdir or os.path.join("outputs", f"amazon_mq_finops_{ts}")
     os.makedirs(outdir, exist_ok=True)
 
-    print("== Amazon MQ FinOps Scan — DATA ONLY ==", file=sys.stderr)
-    print(f"  regions: {', '.join(regions)}", file=sys.stderr)
-    print(f"  days={args.days}, period={eff_period}s", file=sys.stderr)
-    print(f"  outdir: {outdir}", file=sys.stderr)
+    log.info("== Amazon MQ FinOps Scan — DATA ONLY ==")
+    log.info(f"  regions: {', '.join(regions)}")
+    log.info(f"  days={args.days}, period={eff_period}s")
+    log.info(f"  outdir: {outdir}")
 
-    all_rows: List[Dict] = []
+    scan_path = os.path.join(outdir, "mq_finops_scan.csv")
     all_ready: List[Dict] = []
     all_nodes: List[Dict] = []
 
-    for prof in args.profiles:
-        print(f"\n[profile: {prof}]", file=sys.stderr)
-        try:
-            sess = session_for_profile(prof)
-        except ProfileNotFound:
-            print(f"  ! profile '{prof}' not found in ~/.aws/config", file=sys.stderr)
-            continue
-
-        try:
-            acct_id, arn = sts_whoami(sess)
-            print(f"  account: {acct_id}", file=sys.stderr)
-            print(f"  caller : {arn}", file=sys.stderr)
-        except ClientError as e:
-            print(f"  ! STS failed: {e}", file=sys.stderr)
-            continue
-
-        rows, ready, nodes_rows = collect_profile(sess, prof, acct_id, regions, args.days, eff_period, args.per_node)
-        if rows:
-            all_rows.extend(rows)
-            field_order = [
-                "account_id","region","broker_arn","broker_id","broker_name",
-                "engine_type","engine_version","host_instance_type","deployment_mode","broker_state","auto_minor_version_upgrade",
-                "avg_cpu_Xd","max_cpu_Xd","avg_connections_Xd","msg_activity_Xd",
-                "msg_count_avg","msg_ready_avg","publish_rate_avg","ack_rate_avg",
-                "logs_group_name","logs_retention_days","backup_recovery_points_count","backup_last_recovery_point_time","flow_logs_enabled",
-                "flag_idle_candidate","flag_overprovisioned_candidate","flag_single_az_attention","flag_logs_retention_long","flag_no_logs_detected","flag_no_backup_detected","flag_no_flowlogs_detected",
-                "recommended_action",
-                "created_time","maintenance_window_start_time","data_replication_mode","publicly_accessible",
-            ]
-            write_csv(os.path.join(outdir, f"mq_{prof}.csv"), rows, field_order)
-            print(f"  -> wrote {len(rows)} rows to {os.path.join(outdir, f'mq_{prof}.csv')}", file=sys.stderr)
-        else:
-            print("  -> no brokers found / no data.", file=sys.stderr)
-
-        if ready:
-            all_ready.extend(ready)
-        if nodes_rows:
-            all_nodes.extend(nodes_rows)
-
-    if all_rows:
-        field_order = [
-            "account_id","region","broker_arn","broker_id","broker_name",
-            "engine_type","engine_version","host_instance_type","deployment_mode","broker_state","auto_minor_version_upgrade",
-            "avg_cpu_Xd","max_cpu_Xd","avg_connections_Xd","msg_activity_Xd",
-            "msg_count_avg","msg_ready_avg","publish_rate_avg","ack_rate_avg",
-            "logs_group_name","logs_retention_days","backup_recovery_points_count","backup_last_recovery_point_time","flow_logs_enabled",
-            "flag_idle_candidate","flag_overprovisioned_candidate","flag_single_az_attention","flag_logs_retention_long","flag_no_logs_detected","flag_no_backup_detected","flag_no_flowlogs_detected",
-            "recommended_action",
-            "created_time","maintenance_window_start_time","data_replication_mode","publicly_accessible",
-        ]
-        write_csv(os.path.join(outdir, "mq_finops_scan.csv"), all_rows, field_order)
-        print(f"\nALL DONE -> {os.path.join(outdir, 'mq_finops_scan.csv')}", file=sys.stderr)
+    # clients for every profile x region created up front, profiles in parallel
+    prewarm_profiles(args.profiles, lambda s: [warm_clients(s, r, cfg) for r in regions])
+
+    # merged scan CSV is appended per profile (only one profile's rows in memory at a time)
+    with CsvStream(scan_path, _SCAN_FIELDS) as merged:
+        for prof in args.profiles:
+            log.info(f"\n[profile: {prof}]")
+            try:
+                sess = session_for_profile(prof)
+            except ProfileNotFound:
+                log.warning(f"  ! profile '{prof}' not found in ~/.aws/config")
+                continue
+
+            try:
+                acct_id, arn = sts_whoami(sess)
+                log.info(f"  account: {acct_id}")
+                log.info(f"  caller : {arn}")
+            except ClientError as e:
+                log.warning(f"  ! STS failed: {e}")
+                continue
+
+            rows, ready, nodes_rows = collect_profile(sess, prof, acct_id, regions, args.days, eff_period, args.per_node,
+                                                     max_workers=args.max_workers, cfg=cfg,
+                                                     metric_batch_size=args.metric_batch_size)
+            if rows:
+                merged.write_records(rows)
+                write_records(os.path.join(outdir, f"mq_{prof}.csv"), rows, _SCAN_FIELDS)
+                log.info(f"  -> wrote {len(rows)} rows to {os.path.join(outdir, f'mq_{prof}.csv')}")
+            else:
+                log.info("  -> no brokers found / no data.")
+
+            if ready:
+                all_ready.extend(ready)
+            if nodes_rows:
+                all_nodes.extend(nodes_rows)
+
+    if merged.count:
+        log.info(f"\nALL DONE -> {scan_path}")
     else:
-        print("\nNo data collected.", file=sys.stderr)
+        log.info("\nNo data collected.")
 
     if all_ready:
-        ro = ["account_id","region","cloudwatch_access_ok","logs_access_ok","backup_access_ok","ce_access_ok","notes"]
-        write_csv(os.path.join(outdir, "mq_finops_readiness.csv"), all_ready, ro)
+        write_csv(os.path.join(outdir, "mq_finops_readiness.csv"), all_ready, list(_READINESS_FIELDS))
 
     if args.per_node and all_nodes:
-        node_fields = ["region","broker_id","broker_name","node","cpu_avg_pct","rabbitmq_mem_used_avg","network_in_avg_bps","network_out_avg_bps"]
-        write_csv(os.path.join(outdir, "mq_nodes_all_profiles.csv"), all_nodes, node_fields)
-        print(f"  -> wrote per-node {len(all_nodes)} rows to {os.path.join(outdir, 'mq_nodes_all_profiles.csv')}", file=sys.stderr)
+        write_csv(os.path.join(outdir, "mq_nodes_all_profiles.csv"), all_nodes, list(_NODE_FIELDS))
+        log.info(f"  -> wrote per-node {len(all_nodes)} rows to {os.path.join(outdir, 'mq_nodes_all_profiles.csv')}")
 
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
+    with queue_logging():
+        sys.exit(main())
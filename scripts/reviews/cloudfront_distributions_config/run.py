@@ -21,51 +21,93 @@ Collects per-distribution behaviors:
 """
 
 import argparse
+import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from botocore.exceptions import ProfileNotFound
 from botocore.config import Config as BotoConfig
 
-from scripts.common.aws_common import session_for_profile, sts_whoami
-from scripts.common.csvio import ensure_dir, write_csv
+from scripts.common.aws_common import prewarm_profiles, session_for_profile, sts_whoami, with_pool_size
+from scripts.common.logsetup import LOG_LEVELS, queue_logging
+from scripts.common.csvio import CsvStream, ensure_dir, write_tuples
 from scripts.common.cloudfront import (
-    list_all_distributions,
+    iter_distributions,
+    warm_client,
     get_distribution_config,
     origin_oai_oac_flags,
     analyze_behavior,
+    behavior_cache_policy_ids,
+    fetch_cache_policy_config,
 )
 
-CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
+log = logging.getLogger(__name__)
+
+CFG = BotoConfig(retries={"max_attempts": 10, "mode": "adaptive"}, max_pool_connections=50, tcp_keepalive=True)
+# CSV columns == field order of the row tuples collect_for_profile builds
+FIELDNAMES = (
+    "profile", "account_id", "distribution_id", "distribution_domain",
+    "behavior_path", "origin_id", "origin_domain", "origin_type", "origin_has_oai", "origin_has_oac",
+    "cache_policy_mode", "cache_policy_id", "min_ttl", "default_ttl", "max_ttl",
+    "query_behavior", "cookies_behavior", "viewer_protocol_policy",
+)
+# I/O-bound workers for per-distribution GetDistributionConfig calls
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 5)
 
 def parse_args():
     p = argparse.ArgumentParser(description="CloudFront Distributions Config Review")
     p.add_argument("--profiles", nargs="+", required=True)
     p.add_argument("--regions", default="global", help="Not used; CloudFront API is global")
     p.add_argument("--outdir", default=None)
+    p.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                   help=f"Concurrent GetDistributionConfig calls (default {DEFAULT_MAX_WORKERS})")
+    p.add_argument("--max-pool-connections", type=int, default=None,
+                   help="urllib3 pool size for the CloudFront client (default: max(max-workers, 50))")
+    p.add_argument("--log-level", default="INFO", choices=LOG_LEVELS,
+                   help="WARNING hides progress lines and keeps skips/errors")
     return p.parse_args()
 
-def collect_for_profile(profile: str) -> List[Dict]:
-    sess = session_for_profile(profile)
+def _fetch_config(sess, dist: Dict, cfg: BotoConfig) -> Tuple[Dict, Optional[Dict], Optional[Exception]]:
+    # the ListDistributions summary carries everything emit_row reads;
+    # GetDistributionConfig only if a summary came back without behaviors
+    if dist.get("DefaultCacheBehavior") is not None:
+        return dist, dist, None
+    try:
+        return dist, get_distribution_config(sess, dist["Id"], cfg), None
+    except Exception as e:
+        return dist, None, e
+
+def collect_for_profile(sess, profile: str, max_workers: int = DEFAULT_MAX_WORKERS, cfg: BotoConfig = CFG) -> List[Tuple]:
     acct, _ = sts_whoami(sess)
 
-    rows: List[Dict] = []
-    dists = list_all_distributions(sess)
-    cache_policies: Dict[str, Dict] = {}
+    rows: List[Tuple] = []
+    # one cache per profile: distributions mostly share a handful of (managed) cache policies
+    cache_policies: Dict[str, Optional[Dict]] = {}
+
+    # configs normally come straight from the ListDistributions summary; the pool only runs the
+    # GetDistributionConfig fallbacks (iter_distributions creates the cached cloudfront client on
+    # this thread before the first submit); rows are still emitted here, in list order
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        configs = list(ex.map(lambda dist: _fetch_config(sess, dist, cfg), iter_distributions(sess, cfg)))
+
+        # each distinct cache policy fetched once, concurrently; the dict is only written here
+        policy_ids = list(dict.fromkeys(pid for _, dist_cfg, _ in configs if dist_cfg
+                                        for pid in behavior_cache_policy_ids(dist_cfg)))
+        cache_policies.update(zip(policy_ids, ex.map(lambda pid: fetch_cache_policy_config(sess, pid, cfg),
+                                                     policy_ids)))
 
-    for dist in dists:
+    for dist, dist_cfg, err in configs:
         dist_id = dist["Id"]
         domain = dist.get("DomainName")
 
-        try:
-            cfg = get_distribution_config(sess, dist_id)
-        except Exception as e:
-            print(f"[{profile}/{dist_id}] get_distribution_config error: {e}", file=sys.stderr)
+        if err is not None:
+            log.warning(f"[{profile}/{dist_id}] get_distribution_config error: {err}")
             continue
 
-        origins = {o["Id"]: o for o in (cfg.get("Origins", {}).get("Items") or [])}
+        origins = {o["Id"]: o for o in (dist_cfg.get("Origins", {}).get("Items") or [])}
 
         def emit_row(path_label: str, behavior: Dict):
             origin_id = behavior.get("TargetOriginId")
@@ -74,66 +116,75 @@ def collect_for_profile(profile: str) -> List[Dict]:
             origin_domain = origin.get("DomainName")
             viewer_policy = behavior.get("ViewerProtocolPolicy")
 
-            b = analyze_behavior(sess, behavior, cache_policies)
-
-            rows.append({
-                "profile": profile,
-                "account_id": acct,
-                "distribution_id": dist_id,
-                "distribution_domain": domain,
-
-                "behavior_path": path_label,
-                "origin_id": origin_id,
-                "origin_domain": origin_domain,
-                "origin_type": origin_type,
-                "origin_has_oai": has_oai,
-                "origin_has_oac": has_oac,
-
-                "cache_policy_mode": b.get("cache_policy_mode"),
-                "cache_policy_id": b.get("cache_policy_id"),
-                "min_ttl": b.get("min_ttl"),
-                "default_ttl": b.get("default_ttl"),
-                "max_ttl": b.get("max_ttl"),
-                "query_behavior": b.get("query_behavior"),
-                "cookies_behavior": b.get("cookies_behavior"),
-                "viewer_protocol_policy": viewer_policy,
-            })
+            b = analyze_behavior(sess, behavior, cache_policies, cfg)
+
+            # plain tuple in FIELDNAMES order (no per-row dict)
+            rows.append((
+                profile,
+                acct,
+                dist_id,
+                domain,
+
+                path_label,
+                origin_id,
+                origin_domain,
+                origin_type,
+                has_oai,
+                has_oac,
+
+                b.get("cache_policy_mode"),
+                b.get("cache_policy_id"),
+                b.get("min_ttl"),
+                b.get("default_ttl"),
+                b.get("max_ttl"),
+                b.get("query_behavior"),
+                b.get("cookies_behavior"),
+                viewer_policy,
+            ))
 
         # default behavior
-        emit_row("Default", cfg.get("DefaultCacheBehavior") or {})
+        emit_row("Default", dist_cfg.get("DefaultCacheBehavior") or {})
         # additional cache behaviors
-        for cb in (cfg.get("CacheBehaviors", {}).get("Items") or []):
+        for cb in (dist_cfg.get("CacheBehaviors", {}).get("Items") or []):
             emit_row(cb.get("PathPattern", "(unknown)"), cb)
 
     return rows
 
 def main():
     args = parse_args()
+    logging.getLogger().setLevel(args.log_level)
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     outdir = args.outdir or os.path.join("outputs", f"cloudfront_distributions_config_{ts}")
     ensure_dir(outdir)
-
-    all_rows: List[Dict] = []
-    print("== CloudFront Distributions Config Review ==", file=sys.stderr)
-    print(f"  outdir: {outdir}", file=sys.stderr)
-
-    for prof in args.profiles:
-        try:
-            prof_rows = collect_for_profile(prof)
-        except ProfileNotFound:
-            print(f"[!] profile {prof} not found", file=sys.stderr)
-            continue
-        if prof_rows:
-            write_csv(os.path.join(outdir, f"cloudfront_config_{prof}.csv"), prof_rows, prof_rows[0].keys())
-            all_rows.extend(prof_rows)
-
-    if all_rows:
-        write_csv(os.path.join(outdir, "cloudfront_distributions_config_all_profiles.csv"), all_rows, all_rows[0].keys())
-        print(f"\nALL DONE -> {os.path.join(outdir, 'cloudfront_distributions_config_all_profiles.csv')}", file=sys.stderr)
+    cfg = with_pool_size(CFG, args.max_pool_connections or max(args.max_workers, 50))
+
+    merged_path = os.path.join(outdir, "cloudfront_distributions_config_all_profiles.csv")
+    log.info("== CloudFront Distributions Config Review ==")
+    log.info(f"  outdir: {outdir}")
+
+    # cloudfront clients for all profiles created up front, in parallel
+    prewarm_profiles(args.profiles, lambda s: warm_client(s, cfg))
+
+    # merged CSV is appended per profile (only one profile's rows in memory at a time)
+    with CsvStream(merged_path, FIELDNAMES) as merged:
+        for prof in args.profiles:
+            try:
+                sess = session_for_profile(prof)
+                prof_rows = collect_for_profile(sess, prof, max_workers=args.max_workers, cfg=cfg)
+            except ProfileNotFound:
+                log.warning(f"[!] profile {prof} not found")
+                continue
+            if prof_rows:
+                write_tuples(os.path.join(outdir, f"cloudfront_config_{prof}.csv"), prof_rows, FIELDNAMES)
+                merged.write_tuples(prof_rows)
+
+    if merged.count:
+        log.info(f"\nALL DONE -> {merged_path}")
     else:
-        print("\nNo data collected.", file=sys.stderr)
+        log.info("\nNo data collected.")
 
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
+    with queue_logging():
+        sys.exit(main())
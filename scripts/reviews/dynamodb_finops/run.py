@@ -20,23 +20,40 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import heapq
+import json
 import math
 import os
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Sequence, Tuple
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 import boto3
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, ProfileNotFound
 
 # These helpers are assumed to exist in your project (unchanged)
-from scripts.common.cloudwatch import get_metric_statistics_multi, window
-from scripts.common.csvio import write_csv
+from scripts.common.aws_common import sts_whoami, with_pool_size
+from scripts.common.cloudwatch import batch_get_metric_data, metric_data_query, window
+from scripts.common.csvio import CsvStream, write_tuples
 
-CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
+# adaptive: client-side rate limiting once the parallel calls hit CloudWatch/DynamoDB throttles
+# pool is resized per region to cover --max-workers (collect_region); keepalive avoids re-handshakes
+CFG = BotoConfig(retries={"max_attempts": 10, "mode": "adaptive"}, max_pool_connections=50, tcp_keepalive=True)
 DDB_NAMESPACE = "AWS/DynamoDB"
+# GetMetricData accepts up to 500 queries per request
+METRIC_BATCH = 500
+# I/O-bound workers (describe_table / GetMetricData chunks)
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 5)
+# regions in flight at once; each region also runs its own --max-workers pool
+MAX_REGION_WORKERS = 8
+# list_tables + describe_table snapshot per account/region (table metadata rarely changes)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ddb_finops")
+DEFAULT_CACHE_TTL = 3600
 
 # Final CSV columns (lean & actionable)
 CSV_FIELDS: Sequence[str] = (
@@ -91,52 +108,108 @@ CSV_FIELDS: Sequence[str] = (
 )
 
 # Time windows: (days, period seconds)
+SEC_7D = 7 * 24 * 3600
+SEC_30D = 30 * 24 * 3600
+
+# window key -> (days, period). The *_total windows use one period for the whole window, so
+# CloudWatch returns the window's Sum as a single datapoint (series we only ever total).
 TIME_WINDOWS = {
     "7d": (7,   900),
     "30d": (30, 3600),
+    "7d_total": (7, SEC_7D),
+    "30d_total": (30, SEC_30D),
+    "30d_daily": (30, 86400),
 }
 
-SEC_30D = 30 * 24 * 3600
+# expected hourly datapoints in 30d (720); coverage_ok needs COVERAGE_MIN of them
+EXPECTED_SAMPLES_30D = SEC_30D // TIME_WINDOWS["30d"][1]
+COVERAGE_MIN = 0.95
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Decision-rule thresholds (defaults; tune per account)."""
+    stable_ratio: float = 2.0        # 7d peak/avg
+    semi_stable_ratio: float = 3.0
+    low_burst_ratio: float = 2.0     # 30d peak/avg
+    med_burst_ratio: float = 4.0
+    sustained_ops_sec: float = 10.0  # avg read+write ops/sec
+    max_headroom: float = 0.6        # 7d p95 / 30d peak
+
+
+DEFAULT_THRESHOLDS = Thresholds()
+
+# Sum series fetched per table / per GSI: (key, metric, TIME_WINDOWS key)
+TABLE_METRICS: Sequence[Tuple[str, str, str]] = (
+    ("read_7d", "ConsumedReadCapacityUnits", "7d"),
+    ("write_7d", "ConsumedWriteCapacityUnits", "7d"),
+    ("read_30d", "ConsumedReadCapacityUnits", "30d"),
+    ("write_30d", "ConsumedWriteCapacityUnits", "30d"),
+    ("thr_r_7d", "ReadThrottleEvents", "7d_total"),
+    ("thr_w_7d", "WriteThrottleEvents", "7d_total"),
+    ("thr_r_30d", "ReadThrottleEvents", "30d_total"),
+    ("thr_w_30d", "WriteThrottleEvents", "30d_total"),
+)
+GSI_METRICS: Sequence[Tuple[str, str, str]] = (
+    ("read_30d", "ConsumedReadCapacityUnits", "30d"),
+    ("thr_r_30d", "ReadThrottleEvents", "30d_total"),
+    ("thr_w_30d", "WriteThrottleEvents", "30d_total"),
+)
+# probe for empty tables (idle_tables): whole-window totals only
+IDLE_PROBE_METRICS: Sequence[Tuple[str, str]] = (
+    ("idle_read_30d", "ConsumedReadCapacityUnits"),
+    ("idle_write_30d", "ConsumedWriteCapacityUnits"),
+)
+# probe per GSI (active_gsis): daily Sums; writes too, since GSI write throttles follow base-table writes
+GSI_PROBE_METRICS: Sequence[Tuple[str, str]] = (
+    ("probe_read_30d", "ConsumedReadCapacityUnits"),
+    ("probe_write_30d", "ConsumedWriteCapacityUnits"),
+)
+
+# row dict -> tuple in CSV_FIELDS order (KeyError if collect_table misses a column)
+ROW_VALUES = itemgetter(*CSV_FIELDS)
 
+# (table, gsi or None, key) -> aggregate
+AggKey = Tuple[str, Optional[str], str]
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class MetricAggregate:
+    """Sum datapoints of one series; total and peak are computed once, at construction."""
     period_seconds: int
-    sums: List[float]
+    sums: Sequence[float]
+    total_sum: float = field(init=False)
+    peak_per_sec: float = field(init=False)
 
-    @property
-    def total_sum(self) -> float:
-        return float(sum(self.sums)) if self.sums else 0.0
+    def __post_init__(self) -> None:
+        sums, period = self.sums, self.period_seconds
+        object.__setattr__(self, "total_sum", float(sum(sums)) if sums else 0.0)
+        object.__setattr__(self, "peak_per_sec", max(sums) / period if sums and period > 0 else 0.0)
 
     @property
     def samples_count(self) -> int:
         return len(self.sums)
 
-    def _per_second_series(self) -> List[float]:
-        if self.period_seconds <= 0:
-            return []
-        return [val / self.period_seconds for val in self.sums]
-
-    @property
-    def peak_per_sec(self) -> float:
-        series = self._per_second_series()
-        return max(series) if series else 0.0
-
     def percentile_per_sec(self, percentile: float) -> float:
-        series = self._per_second_series()
-        if not series:
+        n = len(self.sums)
+        if not n or self.period_seconds <= 0:
             return 0.0
-        ordered = sorted(series)
-        k = (len(ordered) - 1) * (percentile / 100.0)
+        k = (n - 1) * (percentile / 100.0)
         f = math.floor(k)
-        c = min(f + 1, len(ordered) - 1)
+        c = min(f + 1, n - 1)
+        # only the ranks >= f are needed: a partial heap select instead of sorting the whole series
+        tail = heapq.nlargest(n - f, self.sums)
+        lower = tail[-1] / self.period_seconds
         if f == c:
-            return float(ordered[f])
-        lower = ordered[f]
-        upper = ordered[c]
+            return float(lower)
+        upper = tail[-2] / self.period_seconds
         return float(lower * (c - k) + upper * (k - f))
 
 
+# shared "no datapoints" aggregate for series that were never queried or failed to fetch (frozen, empty tuple)
+_EMPTY_AGG = MetricAggregate(period_seconds=TIME_WINDOWS["30d"][1], sums=())
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Run the DynamoDB FinOps review")
     p.add_argument("--region", required=True, help="AWS region (single or CSV list)")
@@ -146,60 +219,109 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=None,
         help="Path to CSV (default: outputs/dynamodb_finops_<ts>/dynamodb_finops_summary.csv)",
     )
-    return p.parse_args(argv)
+    p.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                   help=f"Concurrent describe_table / GetMetricData calls per region (default {DEFAULT_MAX_WORKERS})")
+    p.add_argument("--cache", action="store_true",
+                   help=f"Reuse list_tables/describe_table results from a previous run (cache in {CACHE_DIR}); "
+                        "ItemCount/TableSizeBytes are then as old as the cache")
+    p.add_argument("--cache-ttl", type=int, default=DEFAULT_CACHE_TTL,
+                   help=f"With --cache: max age of the cached results in seconds (default {DEFAULT_CACHE_TTL})")
+    args = p.parse_args(argv)
+    if args.max_workers < 1:
+        p.error("--max-workers must be at least 1")
+    return args
+
+
+def gsi_dims(table_name: str, gsi: str) -> List[Dict[str, str]]:
+    return [{"Name": "TableName", "Value": table_name},
+            {"Name": "GlobalSecondaryIndexName", "Value": gsi}]
+
+
+ActiveGsi = Dict[str, Set[str]]
 
 
-def gather_agg(
+def metric_requests(
+    table_detail: Dict,
+    active_gsi: Optional[ActiveGsi] = None,
+) -> List[Tuple[AggKey, str, List[Dict[str, str]], str]]:
+    """
+    All Sum series one table needs: table-level TABLE_METRICS + GSI_METRICS per GSI.
+    With active_gsi, only the table's GSIs in it get the GSI fan-out, and a table with
+    none skips the GSI loop.
+    """
+    table_name = table_detail.get("TableName")
+    dims_table = [{"Name": "TableName", "Value": table_name}]
+    reqs = [((table_name, None, key), metric, dims_table, win) for key, metric, win in TABLE_METRICS]
+    seen = None if active_gsi is None else active_gsi.get(table_name)
+    if active_gsi is not None and not seen:
+        return reqs
+    for g in table_detail.get("GlobalSecondaryIndexes") or []:
+        gsi = g.get("IndexName")
+        if not gsi or (seen is not None and gsi not in seen):
+            continue
+        dims = gsi_dims(table_name, gsi)
+        reqs.extend(((table_name, gsi, key), metric, dims, win) for key, metric, win in GSI_METRICS)
+    return reqs
+
+
+def fetch_aggregates(
     cw,
-    metric_name: str,
-    dimensions: List[Dict[str, str]],
-    days: int,
-    period: int,
-) -> MetricAggregate:
-    """Fetch datapoints (Sum) and normalize to per-second rates."""
-    dps = get_metric_statistics_multi(
-        cw,
-        namespace=DDB_NAMESPACE,
-        metric_name=metric_name,
-        dimensions=dimensions,
-        start=window(days)[0],
-        end=window(days)[1],
-        period=period,
-        statistics=["Sum"],
-    )
-    sums: List[float] = []
-    for dp in dps:
-        if "Sum" not in dp:
+    requests: Sequence[Tuple[AggKey, str, List[Dict[str, str]], str]],
+    windows: Dict[str, Tuple[datetime, datetime]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[AggKey, MetricAggregate]:
+    """
+    GetMetricData (Sum) for every requested series in the region, instead of one
+    GetMetricStatistics call each: queries grouped per time window, 500 per call, and the
+    calls (windows x chunks) run concurrently.
+    A failed call only leaves its own series out of the result (callers fall back to empty).
+    """
+    jobs = []
+    for win, (_, period) in TIME_WINDOWS.items():
+        reqs = [r for r in requests if r[3] == win]
+        if not reqs:
             continue
+        start, end = windows[win]
+        for i in range(0, len(reqs), METRIC_BATCH):
+            jobs.append((win, period, reqs[i:i + METRIC_BATCH], start, end))
+
+    def run(job) -> Dict[AggKey, MetricAggregate]:
+        win, period, reqs, start, end = job
+        queries = [metric_data_query(f"q{i}", DDB_NAMESPACE, metric, dims, period, stat="Sum")
+                   for i, (_, metric, dims, _) in enumerate(reqs)]
         try:
-            sums.append(float(dp["Sum"]))
-        except Exception:
-            continue
-    return MetricAggregate(period_seconds=period, sums=sums)
+            series = batch_get_metric_data(cw, queries, start, end, METRIC_BATCH)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code", "Unknown")
+            print(f"[metrics {win}] {len(reqs)} series -> {code}; left empty", file=sys.stderr)
+            return {}
+        return {key: MetricAggregate(period_seconds=period, sums=series.get(f"q{i}", ([], []))[1])
+                for i, (key, _, _, _) in enumerate(reqs)}
+
+    out: Dict[AggKey, MetricAggregate] = {}
+    if not jobs:
+        return out
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as ex:
+        for part in ex.map(run, jobs):
+            out.update(part)
+    return out
 
 
 def fetch_gsi_signals(
-    cw,
+    aggs: Dict[AggKey, MetricAggregate],
     table_name: str,
     gsi_names: List[str],
 ) -> Tuple[str, float, str, float]:
     """Return top GSI by read peak and top GSI by throttle sum (30d)."""
     best_read_name, best_read_peak = "", 0.0
     best_thr_name, best_thr_sum = "", 0.0
+    empty = _EMPTY_AGG
     for gsi in gsi_names:
-        dims = [{"Name": "TableName", "Value": table_name},
-                {"Name": "GlobalSecondaryIndexName", "Value": gsi}]
-        # Read peak (30d)
-        read_30d = gather_agg(
-            cw, "ConsumedReadCapacityUnits", dims, days=30, period=3600
-        )
+        # Read peak (30d); missing for GSIs the probe found cold (and for failed batches)
+        read_30d = aggs.get((table_name, gsi, "read_30d"), empty)
         # Throttle sum (30d)
-        thr_r_30d = gather_agg(
-            cw, "ReadThrottleEvents", dims, days=30, period=3600
-        ).total_sum
-        thr_w_30d = gather_agg(
-            cw, "WriteThrottleEvents", dims, days=30, period=3600
-        ).total_sum
+        thr_r_30d = aggs.get((table_name, gsi, "thr_r_30d"), empty).total_sum
+        thr_w_30d = aggs.get((table_name, gsi, "thr_w_30d"), empty).total_sum
 
         if read_30d.peak_per_sec > best_read_peak:
             best_read_peak = read_30d.peak_per_sec
@@ -223,12 +345,52 @@ def stability_ratio(peak: float, avg: float) -> float:
     return peak / avg
 
 
+# decide() codes -> CSV recommendation text
+RECOMMENDATIONS = (
+    "NEED_MORE_DATA",
+    "ON_DEMAND | throttles observed",
+    "PROVISIONED_STRONG (AS target~70%)",
+    "PROVISIONED_CAUTIOUS (AS target~70% + alarms)",
+    "ON_DEMAND",
+)
+
+
+def decide(
+    stab_r: float, stab_w: float,
+    spike_r: float, spike_w: float,
+    headroom_r: float, headroom_w: float,
+    avg_ops: float, thr_sum: float,
+    coverage_ok: bool,
+    t: Thresholds = DEFAULT_THRESHOLDS,
+) -> int:
+    """Decision rules (keep it transparent); returns an index into RECOMMENDATIONS."""
+    # base guards
+    if not coverage_ok:
+        return 0
+    if thr_sum > 0:
+        return 1
+
+    # Stable & sustained => Provisioned + AS
+    stable = (stab_r <= t.stable_ratio) and (stab_w <= t.stable_ratio)
+    semi_stable = (stab_r <= t.semi_stable_ratio) and (stab_w <= t.semi_stable_ratio)
+    low_burst = (spike_r <= t.low_burst_ratio) and (spike_w <= t.low_burst_ratio)
+    med_burst = (spike_r <= t.med_burst_ratio) and (spike_w <= t.med_burst_ratio)
+    sustained = (avg_ops >= t.sustained_ops_sec)
+
+    if stable and low_burst and sustained and (headroom_r <= t.max_headroom) and (headroom_w <= t.max_headroom):
+        return 2
+    if sustained and (semi_stable or med_burst):
+        return 3
+    return 4
+
+
 def collect_table(
-    session,
-    cw,
+    aggs: Dict[AggKey, MetricAggregate],
     region: str,
     table_detail: Dict,
-) -> Dict:
+    thresholds: Thresholds = DEFAULT_THRESHOLDS,
+    idle: bool = False,
+) -> Tuple:
     # --- Metadata ---
     table_name = table_detail.get("TableName")
     billing_summary = table_detail.get("BillingModeSummary") or {}
@@ -253,18 +415,18 @@ def collect_table(
         "GSI_Count": len(gsi_names),
     }
 
-    # --- Table-level metrics (7d/30d) ---
-    dims_table = [{"Name": "TableName", "Value": table_name}]
-
-    read_7d = gather_agg(cw, "ConsumedReadCapacityUnits", dims_table, 7, 900)
-    write_7d = gather_agg(cw, "ConsumedWriteCapacityUnits", dims_table, 7, 900)
-    read_30d = gather_agg(cw, "ConsumedReadCapacityUnits", dims_table, 30, 3600)
-    write_30d = gather_agg(cw, "ConsumedWriteCapacityUnits", dims_table, 30, 3600)
+    # --- Table-level metrics (7d/30d), already fetched for the whole region ---
+    # (idle tables were never queried: every series is empty)
+    empty = _EMPTY_AGG
+    read_7d = aggs.get((table_name, None, "read_7d"), empty)
+    write_7d = aggs.get((table_name, None, "write_7d"), empty)
+    read_30d = aggs.get((table_name, None, "read_30d"), empty)
+    write_30d = aggs.get((table_name, None, "write_30d"), empty)
 
-    thr_r_7d = gather_agg(cw, "ReadThrottleEvents", dims_table, 7, 900).total_sum
-    thr_w_7d = gather_agg(cw, "WriteThrottleEvents", dims_table, 7, 900).total_sum
-    thr_r_30d = gather_agg(cw, "ReadThrottleEvents", dims_table, 30, 3600).total_sum
-    thr_w_30d = gather_agg(cw, "WriteThrottleEvents", dims_table, 30, 3600).total_sum
+    thr_r_7d = aggs.get((table_name, None, "thr_r_7d"), empty).total_sum
+    thr_w_7d = aggs.get((table_name, None, "thr_w_7d"), empty).total_sum
+    thr_r_30d = aggs.get((table_name, None, "thr_r_30d"), empty).total_sum
+    thr_w_30d = aggs.get((table_name, None, "thr_w_30d"), empty).total_sum
 
     # --- Derived: totals & avg/sec (30d) ---
     total_30d_read = read_30d.total_sum
@@ -283,19 +445,20 @@ def collect_table(
     # stability 7d (peak/avg where avg from Sum/period)
     # compute avg/sec for 7d to make stability meaningful
     # Derive avg/sec from sums: (sum of all Sum datapoints) / (seconds in 7d)
-    SEC_7D = 7 * 24 * 3600
     avg_7d_read_per_sec = safe_div(read_7d.total_sum, SEC_7D)
     avg_7d_write_per_sec = safe_div(write_7d.total_sum, SEC_7D)
     stability_7d_read = stability_ratio(read_7d.peak_per_sec, avg_7d_read_per_sec)
     stability_7d_write = stability_ratio(write_7d.peak_per_sec, avg_7d_write_per_sec)
 
     # Coverage stats from 30d
-    # expected samples = 30d / period (period=3600)
-    expected_samples_30d = math.floor(SEC_30D / 3600)
+    expected_samples_30d = EXPECTED_SAMPLES_30D
     samples_30d_read = read_30d.samples_count
     samples_30d_write = write_30d.samples_count
-    coverage_ok = (samples_30d_read >= expected_samples_30d * 0.95) and \
-                  (samples_30d_write >= expected_samples_30d * 0.95)
+    # a table-level series whose GetMetricData batch failed is absent from aggs -> no coverage
+    metrics_complete = all((table_name, None, key) in aggs for key, _, _ in TABLE_METRICS)
+    coverage_ok = metrics_complete and \
+                  (samples_30d_read >= expected_samples_30d * COVERAGE_MIN) and \
+                  (samples_30d_write >= expected_samples_30d * COVERAGE_MIN)
 
     # spike ratios (30d): peak/avg_per_sec
     avg_30d_total_per_sec_read = avg_30d_read_per_sec
@@ -314,28 +477,16 @@ def collect_table(
     gsi_top_name_by_read_peak, gsi_top_read_peak_30d, gsi_top_name_by_throttle, gsi_top_throttle_30d_sum = ("", 0.0, "", 0.0)
     if gsi_names:
         gsi_top_name_by_read_peak, gsi_top_read_peak_30d, gsi_top_name_by_throttle, gsi_top_throttle_30d_sum = \
-            fetch_gsi_signals(cw, table_name, gsi_names)
+            fetch_gsi_signals(aggs, table_name, gsi_names)
 
-    # --- Decision rules (keep it transparent) ---
-    # base guards
-    if not coverage_ok:
-        recommendation = "NEED_MORE_DATA"
-    elif (thr_r_7d + thr_w_7d + thr_r_30d + thr_w_30d) > 0:
-        recommendation = "ON_DEMAND | throttles observed"
-    else:
-        # Stable & sustained => Provisioned + AS
-        stable = (stability_7d_read <= 2.0) and (stability_7d_write <= 2.0)
-        semi_stable = (stability_7d_read <= 3.0) and (stability_7d_write <= 3.0)
-        low_burst = (read_spike_ratio <= 2.0) and (write_spike_ratio <= 2.0)
-        med_burst = (read_spike_ratio <= 4.0) and (write_spike_ratio <= 4.0)
-        sustained = (avg_ops_sec >= 10.0)  # default threshold; tune per account
-
-        if stable and low_burst and sustained and (headroom_r <= 0.6) and (headroom_w <= 0.6):
-            recommendation = "PROVISIONED_STRONG (AS target~70%)"
-        elif sustained and (semi_stable or med_burst):
-            recommendation = "PROVISIONED_CAUTIOUS (AS target~70% + alarms)"
-        else:
-            recommendation = "ON_DEMAND"
+    # --- Decision rules ---
+    recommendation = "IDLE" if idle else RECOMMENDATIONS[decide(
+        stability_7d_read, stability_7d_write,
+        read_spike_ratio, write_spike_ratio,
+        headroom_r, headroom_w,
+        avg_ops_sec, thr_r_7d + thr_w_7d + thr_r_30d + thr_w_30d,
+        coverage_ok, thresholds,
+    )]
 
     # --- Build row ---
     row.update({
@@ -373,35 +524,156 @@ def collect_table(
 
         "recommendation": recommendation,
     })
-    return row
+    return ROW_VALUES(row)
 
 
-def collect_region(session, region: str) -> List[Dict]:
-    dynamodb = session.client("dynamodb", region_name=region, config=CFG)
-    cw = session.client("cloudwatch", region_name=region, config=CFG)
+def describe_table(dynamodb, region: str, table_name: str) -> Optional[Dict]:
+    try:
+        return dynamodb.describe_table(TableName=table_name)["Table"]
+    except ClientError as exc:
+        code = exc.response.get("Error", {}).get("Code", "Unknown")
+        print(f"[{region}] describe_table {table_name} -> {code}", file=sys.stderr)
+        return None
+
 
+def time_windows() -> Dict[str, Tuple[datetime, datetime]]:
+    """(start, end) per TIME_WINDOWS key; computed once per run so every region/query shares them."""
+    by_days = {days: window(days) for days, _ in TIME_WINDOWS.values()}
+    return {win: by_days[days] for win, (days, _) in TIME_WINDOWS.items()}
+
+
+def load_table_cache(path: str, ttl: int) -> Optional[Tuple[List[Dict], float]]:
+    """
+    (cached describe_table results for a region, their age in seconds), or None if
+    missing / older than ttl / unreadable.
+    """
+    try:
+        age = time.time() - os.path.getmtime(path)
+        if age > ttl:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["tables"], age
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_table_cache(path: str, details: List[Dict]) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # datetimes (CreationDateTime etc.) are stored as strings; nothing downstream reads them
+            json.dump({"tables": details}, f, default=str)
+        os.replace(tmp, path)
+    except OSError as exc:
+        print(f"[cache] write {path} failed: {exc}", file=sys.stderr)
+
+
+def list_table_details(
+    dynamodb, region: str, max_workers: int = DEFAULT_MAX_WORKERS
+) -> Tuple[List[Dict], bool]:
+    """Returns (details, complete): complete is False when any describe_table call failed."""
     paginator = dynamodb.get_paginator("list_tables")
-    table_names: List[str] = []
-    for page in paginator.paginate():
-        table_names.extend(page.get("TableNames", []))
+    # ListTables caps Limit at 100; pinned so each page is a full one
+    pages = paginator.paginate(PaginationConfig={"PageSize": 100})
+    table_names = (name for page in pages for name in page.get("TableNames", []))
 
-    rows: List[Dict] = []
-    for table_name in sorted(table_names):
-        try:
-            detail = dynamodb.describe_table(TableName=table_name)["Table"]
-        except ClientError as exc:
-            code = exc.response.get("Error", {}).get("Code", "Unknown")
-            print(f"[{region}] describe_table {table_name} -> {code}", file=sys.stderr)
-            continue
+    # describe_table calls concurrently, submitted page by page as ListTables returns names
+    # (already in order; ex.map keeps it)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        described = list(ex.map(lambda name: describe_table(dynamodb, region, name), table_names))
+    details = [d for d in described if d]
+    return details, len(details) == len(described)
 
-        try:
-            row = collect_table(session, cw, region, detail)
-            rows.append(row)
-        except ClientError as exc:
-            code = exc.response.get("Error", {}).get("Code", "Unknown")
-            print(f"[{region}] metrics {table_name} -> {code}", file=sys.stderr)
-            continue
-    return rows
+
+def idle_tables(
+    cw,
+    details: Sequence[Dict],
+    windows: Dict[str, Tuple[datetime, datetime]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Set[str]:
+    """
+    Empty tables (ItemCount 0) with no consumed read or write capacity in 30d: one whole-window Sum
+    datapoint per series, so they can skip the full metric fan-out.
+    """
+    empty_names = [d.get("TableName") for d in details if not d.get("ItemCount") and d.get("TableName")]
+    if not empty_names:
+        return set()
+    requests = [((name, None, key), metric, [{"Name": "TableName", "Value": name}], "30d_total")
+                for name in empty_names for key, metric in IDLE_PROBE_METRICS]
+    aggs = fetch_aggregates(cw, requests, windows, max_workers)
+    # a series missing from aggs failed to fetch: not proven idle, so the table gets the full fan-out
+    return {name for name in empty_names
+            if all((name, None, key) in aggs and aggs[(name, None, key)].total_sum == 0
+                   for key, _ in IDLE_PROBE_METRICS)}
+
+
+def active_gsis(
+    cw,
+    details: Sequence[Dict],
+    windows: Dict[str, Tuple[datetime, datetime]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> ActiveGsi:
+    """
+    table -> GSIs with consumed read or write capacity in 30d: GSI_PROBE_METRICS at a daily
+    period for every GSI, so cold GSIs skip the GSI_METRICS fan-out. GetMetricData over the whole
+    window, not ListMetrics (which only lists metrics with data in the last ~2 weeks).
+    """
+    pairs = [(d.get("TableName"), g.get("IndexName")) for d in details
+             for g in d.get("GlobalSecondaryIndexes") or [] if d.get("TableName") and g.get("IndexName")]
+    if not pairs:
+        return {}
+    requests = [((name, gsi, key), metric, gsi_dims(name, gsi), "30d_daily")
+                for name, gsi in pairs for key, metric in GSI_PROBE_METRICS]
+    aggs = fetch_aggregates(cw, requests, windows, max_workers)
+    # a series missing from aggs failed to fetch: not proven cold, so the GSI keeps its fan-out
+    active: ActiveGsi = {}
+    for name, gsi in pairs:
+        if any((name, gsi, key) not in aggs or aggs[(name, gsi, key)].total_sum > 0
+               for key, _ in GSI_PROBE_METRICS):
+            active.setdefault(name, set()).add(gsi)
+    return active
+
+
+def collect_region(
+    session,
+    region: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    windows: Optional[Dict[str, Tuple[datetime, datetime]]] = None,
+    cache_path: Optional[str] = None,
+    cache_ttl: int = DEFAULT_CACHE_TTL,
+    thresholds: Thresholds = DEFAULT_THRESHOLDS,
+) -> Iterator[Tuple]:
+    """Yields one CSV row (tuple in CSV_FIELDS order) per table, as each table is evaluated."""
+    # clients built here, on the calling thread; the worker threads only use them
+    # one connection per worker thread, so the urllib3 pool never caps --max-workers
+    cfg = with_pool_size(CFG, max(max_workers, 50))
+    dynamodb = session.client("dynamodb", region_name=region, config=cfg)
+    cw = session.client("cloudwatch", region_name=region, config=cfg)
+
+    cached = load_table_cache(cache_path, cache_ttl) if cache_path else None
+    if cached is not None:
+        details, age = cached
+        # ItemCount / TableSizeBytes (idle_tables, TableSizeMB) are as old as the cache
+        print(f"[cache] {region}: table details from {int(age // 60)} min ago ({cache_path})", file=sys.stderr)
+    else:
+        details, complete = list_table_details(dynamodb, region, max_workers)
+        # a partial listing (failed describe_table) isn't cached, so the next run retries it
+        if cache_path and complete:
+            save_table_cache(cache_path, details)
+
+    windows = windows or time_windows()
+    idle = idle_tables(cw, details, windows, max_workers)
+    active = [d for d in details if d.get("TableName") not in idle]
+
+    # every (non-idle) table's and active GSI's series in one batched pass for the region
+    active_gsi = active_gsis(cw, active, windows, max_workers)
+    requests = [r for detail in active for r in metric_requests(detail, active_gsi)]
+    # failed batches leave their series empty: those tables still get a row (coverage_ok False)
+    aggs = fetch_aggregates(cw, requests, windows, max_workers)
+
+    for detail in details:
+        yield collect_table(aggs, region, detail, thresholds, detail.get("TableName") in idle)
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
@@ -422,18 +694,35 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         print(f"Profile '{args.profile}' not found", file=sys.stderr)
         return 2
 
-    all_rows: List[Dict] = []
-    for region in regions:
-        all_rows.extend(collect_region(session, region))
-
-    # Write CSV output
-    write_csv(output_path, all_rows, CSV_FIELDS)
+    account_id: Optional[str] = None
+    if args.cache:
+        try:
+            account_id, _ = sts_whoami(session)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code", "Unknown")
+            print(f"[cache] sts -> {code}; table cache disabled", file=sys.stderr)
+
+    windows = time_windows()
+
+    def run_region(region: str) -> List[Tuple]:
+        # own Session per region thread: client creation on a shared Session isn't thread-safe
+        sess = session if len(regions) == 1 else boto3.Session(profile_name=args.profile)
+        cache_path = os.path.join(CACHE_DIR, f"{account_id}_{region}.json") if account_id else None
+        return list(collect_region(sess, region, args.max_workers, windows, cache_path, args.cache_ttl))
+
+    # regions run concurrently; rows are written per region, in --region order, as each finishes
+    # (partial output survives a crash)
+    with CsvStream(output_path, CSV_FIELDS) as out, ThreadPoolExecutor(max_workers=min(MAX_REGION_WORKERS, len(regions))) as ex:
+        for rows in ex.map(run_region, regions):
+            out.write_tuples(rows)
+    if not out.count:
+        write_tuples(output_path, [], CSV_FIELDS)  # header-only file, as before
     print(f'open "{output_path}"')
 
     print("=== DynamoDB FinOps Review (Clean) ===")
     print(f"Profile: {args.profile}")
     print(f"Regions: {', '.join(regions)}")
-    print(f"Tables scanned: {len(all_rows)}")
+    print(f"Tables scanned: {out.count}")
     print(f"CSV written to: {output_path}")
     return 0
 
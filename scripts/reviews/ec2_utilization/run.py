@@ -32,6 +32,8 @@ import datetime
 
 import sys
 from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple, Optional
 
@@ -39,7 +41,10 @@ import boto3
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, ProfileNotFound
 
+from scripts.common.cloudwatch import batch_get_metric_data, metric_data_query
+
 CFG = BotoConfig(retries={"max_attempts": 10, "mode": "standard"})
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
 
 # ----------------- time & math helpers -----------------
 
@@ -53,16 +58,6 @@ def iso(dt: Optional[datetime]) -> str:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc).isoformat()
 
-def chunk_windows(start: datetime, end: datetime, max_days: int) -> List[Tuple[datetime, datetime]]:
-    windows = []
-    cur = start
-    step = timedelta(days=max_days)
-    while cur < end:
-        nxt = min(cur + step, end)
-        windows.append((cur, nxt))
-        cur = nxt
-    return windows
-
 def mean(xs: List[float]) -> float:
     return sum(xs) / len(xs) if xs else 0.0
 
@@ -162,65 +157,57 @@ def is_t_family(instance_type: str) -> bool:
 def cw_get_metric_data(cw, queries: List[Dict], start: datetime, end: datetime):
     return cw.get_metric_data(MetricDataQueries=queries, StartTime=start, EndTime=end, ScanBy="TimestampAscending")
 
-def fetch_cpu_points_5m(cw, instance_id: str, start: datetime, end: datetime) -> List[float]:
-    points: List[float] = []
-    for s, e in chunk_windows(start, end, max_days=5):
-        resp = cw_get_metric_data(cw, [{
-            "Id": "cpu",
-            "MetricStat": {
-                "Metric": {
-                    "Namespace": "AWS/EC2",
-                    "MetricName": "CPUUtilization",
-                    "Dimensions": [{"Name": "InstanceId", "Value": instance_id}]
-                },
-                "Period": 300,
-                "Stat": "Average"
-            },
-            "ReturnData": True
-        }], s, e)
-        for r in resp.get("MetricDataResults", []):
-            points.extend(r.get("Values", []))
-    return points
-
-def fetch_network_daily_mb(cw, instance_id: str, start: datetime, end: datetime) -> float:
-    resp = cw_get_metric_data(cw, [
-        {"Id": "in_sum", "MetricStat": {"Metric": {"Namespace":"AWS/EC2","MetricName":"NetworkIn",
-         "Dimensions":[{"Name":"InstanceId","Value":instance_id}]}, "Period":86400, "Stat":"Sum"}, "ReturnData": True},
-        {"Id": "out_sum","MetricStat": {"Metric": {"Namespace":"AWS/EC2","MetricName":"NetworkOut",
-         "Dimensions":[{"Name":"InstanceId","Value":instance_id}]}, "Period":86400, "Stat":"Sum"}, "ReturnData": True}
-    ], start, end)
-    in_vals = out_vals = []
-    for r in resp.get("MetricDataResults", []):
-        if r["Id"] == "in_sum": in_vals = r.get("Values", [])
-        elif r["Id"] == "out_sum": out_vals = r.get("Values", [])
+# (key, metric, period, stat) per instance; CPUCreditBalance only for T-family
+INSTANCE_METRICS = (
+    ("cpu", "CPUUtilization", 300, "Average"),
+    ("net_in", "NetworkIn", 86400, "Sum"),
+    ("net_out", "NetworkOut", 86400, "Sum"),
+)
+CREDIT_METRIC = ("credit", "CPUCreditBalance", 300, "Minimum")
+# GetMetricData accepts up to 500 queries per request
+METRIC_BATCH = 500
+
+def fetch_instance_metrics(cw, instances: List[Dict], start: datetime, end: datetime,
+                           label: str = "") -> Dict[str, Dict[str, List[float]]]:
+    """
+    CPU / NetworkIn / NetworkOut (+ CPUCreditBalance for T-family) for all of a region's instances
+    in batched GetMetricData calls (500 queries each, NextToken followed) instead of 3-4 calls per instance.
+    Returns instance_id -> {"cpu", "net_in", "net_out"[, "credit"]} -> values, ascending by time.
+    An instance's queries never span two calls; instances of a call that failed are left out.
+    """
+    # chunks of (queries, owners), owners: query index -> (instance_id, key)
+    chunks: List[Tuple[List[Dict], List[Tuple[str, str]]]] = [([], [])]
+    for i, inst in enumerate(instances):
+        iid = inst["InstanceId"]
+        dims = [{"Name": "InstanceId", "Value": iid}]
+        specs = INSTANCE_METRICS + ((CREDIT_METRIC,) if is_t_family(inst["InstanceType"]) else ())
+        if len(chunks[-1][0]) + len(specs) > METRIC_BATCH:
+            chunks.append(([], []))
+        queries, owners = chunks[-1]
+        for key, metric, period, stat in specs:
+            queries.append(metric_data_query(f"{key}_{i}", "AWS/EC2", metric, dims, period, stat=stat))
+            owners.append((iid, key))
+
+    out: Dict[str, Dict[str, List[float]]] = defaultdict(dict)
+    for queries, owners in chunks:
+        if not queries:
+            continue
+        try:
+            series = batch_get_metric_data(cw, queries, start, end, METRIC_BATCH)
+        except ClientError as e:
+            print(f"[{label}] GetMetricData ({len(set(owners))} instances) failed: {e}", file=sys.stderr)
+            continue
+        for q, (iid, key) in zip(queries, owners):
+            out[iid][key] = series.get(q["Id"], ([], []))[1]
+    return out
+
+def network_daily_mb(in_vals: List[float], out_vals: List[float]) -> float:
     days = min(len(in_vals), len(out_vals))
     if days == 0:
         return 0.0
     total_bytes = sum(in_vals[:days]) + sum(out_vals[:days])
     return (total_bytes / (1024 * 1024)) / days
 
-def fetch_cpu_credit_min(cw, instance_id: str, start: datetime, end: datetime) -> Optional[float]:
-    mins: List[float] = []
-    for s, e in chunk_windows(start, end, max_days=5):
-        resp = cw_get_metric_data(cw, [{
-            "Id": "credit",
-            "MetricStat": {
-                "Metric": {
-                    "Namespace": "AWS/EC2",
-                    "MetricName": "CPUCreditBalance",
-                    "Dimensions": [{"Name": "InstanceId", "Value": instance_id}]
-                },
-                "Period": 300,
-                "Stat": "Minimum"
-            },
-            "ReturnData": True
-        }], s, e)
-        for r in resp.get("MetricDataResults", []):
-            vals = r.get("Values", [])
-            if vals:
-                mins.append(min(vals))
-    return min(mins) if mins else None
-
 # ---------- EBS volumes ----------
 
 def collect_ebs_volumes(sess, region: str, instances_map: Dict[str, Dict]) -> List[Dict]:
@@ -420,6 +407,149 @@ def collect_nat_gateways(sess, region: str, start: datetime, end: datetime) -> L
             })
     return rows
 
+# ---------- per-region collection ----------
+
+@dataclass
+class RegionResult:
+    rows: List[Dict] = field(default_factory=list)
+    categories: Counter = field(default_factory=Counter)
+    states: Counter = field(default_factory=Counter)
+    ebs: List[Dict] = field(default_factory=list)
+    snapshots: List[Dict] = field(default_factory=list)
+    eips: List[Dict] = field(default_factory=list)
+    eip_per_instance: List[Dict] = field(default_factory=list)
+    nat: List[Dict] = field(default_factory=list)
+
+def process_region(sess, profile: str, account_id: str, account_name: str, region: str, args,
+                   start: datetime, end: datetime, nat_start: datetime) -> RegionResult:
+    """
+    Everything collected for one profile/region (utilization rows + infra complements).
+    Runs on a worker thread with its own Session; results are merged by main.
+    """
+    res = RegionResult()
+    cw = sess.client("cloudwatch", region_name=region, config=CFG)
+
+    # ---------- existing EC2 utilization (running only) ----------
+    try:
+        running_instances = list_running_instances(sess, region)
+    except ClientError as e:
+        print(f"[{profile}/{region}] describe_instances (running) failed: {e}", file=sys.stderr)
+        running_instances = []
+
+    # CPU / network / credits for every running instance of the region in one batched pass
+    # (instances of a failed call are missing: their rows are written without metrics, not as idle)
+    metrics = fetch_instance_metrics(cw, running_instances, start, end, f"{profile}/{region}")
+
+    for inst in running_instances:
+        iid = inst["InstanceId"]
+        itype = inst["InstanceType"]
+        name = inst.get("Name", "")
+        m = metrics.get(iid)
+        if m is None:
+            row = {
+                "account_id": account_id,
+                "account_name": account_name,
+                "region": region,
+                "instance_id": iid,
+                "name": name,
+                "type": itype,
+                "cpu_avg_pct": "",
+                "cpu_p95_pct": "",
+                "net_mb_per_day": "",
+                "cpu_credit_balance": "",
+                "category": "Unknown",
+                "note": "CloudWatch metrics unavailable; not categorized."
+            }
+            res.rows.append(row)
+            res.categories["Unknown"] += 1
+            continue
+
+        # CPU
+        cpu_points = m.get("cpu", [])
+        cpu_avg = mean(cpu_points)
+        cpu_p95_ = p95(cpu_points)
+
+        # Network
+        net_mb_day = network_daily_mb(m.get("net_in", []), m.get("net_out", []))
+
+        # Credits (T-family only)
+        credits = m.get("credit")
+        credit_min = min(credits) if credits else None
+
+        category, note = categorize(cpu_avg, cpu_p95_, net_mb_day)
+        row = {
+            "account_id": account_id,
+            "account_name": account_name,
+            "region": region,
+            "instance_id": iid,
+            "name": name,
+            "type": itype,
+            "cpu_avg_pct": round(cpu_avg, 2),
+            "cpu_p95_pct": round(cpu_p95_, 2),
+            "net_mb_per_day": round(net_mb_day, 2),
+            "cpu_credit_balance": "" if credit_min is None else round(credit_min, 2),
+            "category": category,
+            "note": note
+        }
+        res.rows.append(row)
+        res.categories[category] += 1
+
+    # ---------- NEW: infra complements ----------
+    # build instance state map once per region to support EBS/EIP summaries
+    try:
+        inst_map = list_instances_all_states(sess, region)
+    except ClientError as e:
+        print(f"[{profile}/{region}] describe_instances (all states) failed: {e}", file=sys.stderr)
+        inst_map = {}
+
+    # state summary
+    for iid, meta in inst_map.items():
+        res.states[meta.get("state","unknown")] += 1
+
+    # EBS volumes
+    if not args.skip_ebs:
+        try:
+            vol_rows = collect_ebs_volumes(sess, region, inst_map)
+            # decorate account info
+            for r in vol_rows:
+                r.update({"account_id": account_id, "account_name": account_name})
+            res.ebs.extend(vol_rows)
+        except ClientError as e:
+            print(f"[{profile}/{region}] describe_volumes failed: {e}", file=sys.stderr)
+
+    # Snapshots (needs existing volume IDs for 'is_volume_present')
+    if not args.skip_snapshots:
+        existing_vol_ids = {r["volume_id"] for r in res.ebs if r.get("volume_id")}
+        try:
+            snap_rows = collect_snapshots(sess, region, existing_vol_ids, args.snap_old_days)
+            for r in snap_rows:
+                r.update({"account_id": account_id, "account_name": account_name})
+            res.snapshots.extend(snap_rows)
+        except ClientError as e:
+            print(f"[{profile}/{region}] describe_snapshots failed: {e}", file=sys.stderr)
+
+    # EIPs
+    if not args.skip_eips:
+        addrs, per_inst = collect_eips(sess, region)
+        for r in addrs:
+            r.update({"account_id": account_id, "account_name": account_name})
+        for r in per_inst:
+            r.update({"account_id": account_id, "account_name": account_name})
+        res.eips.extend(addrs)
+        res.eip_per_instance.extend(per_inst)
+
+    # NAT Gateways
+    if not args.skip_nat:
+        try:
+            nat_rows = collect_nat_gateways(sess, region, nat_start, end)
+            for r in nat_rows:
+                r.update({"account_id": account_id, "account_name": account_name})
+            res.nat.extend(nat_rows)
+        except ClientError as e:
+            print(f"[{profile}/{region}] NAT collection failed: {e}", file=sys.stderr)
+
+    return res
+
 # ---------- IO ----------
 
 def ensure_dir(path: str):
@@ -443,13 +573,18 @@ def parse_args():
     p.add_argument("--nat-days", type=int, default=7, help="NAT metrics window (days)")
     p.add_argument("--snap-old-days", type=int, default=90, help="Threshold for old snapshots")
     p.add_argument("--outdir", default=None)
+    p.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                   help=f"Profile/region pairs collected concurrently (default {DEFAULT_MAX_WORKERS})")
 
     # optional skips (defaults: collect)
     p.add_argument("--skip-ebs", action="store_true")
     p.add_argument("--skip-snapshots", action="store_true")
     p.add_argument("--skip-eips", action="store_true")
     p.add_argument("--skip-nat", action="store_true")
-    return p.parse_args()
+    args = p.parse_args()
+    if args.max_workers < 1:
+        p.error("--max-workers must be at least 1")
+    return args
 
 # ---------- MAIN ----------
 
@@ -474,127 +609,35 @@ def main():
     nat_rows_all: List[Dict] = []
     inst_state_summary: Counter = Counter()
 
-    for profile in args.profiles:
-        sess = session_for_profile(profile)
-        account_id, _ = sts_whoami(sess)
-        account_name = sess.profile_name
-        regions = list_regions(sess, args.regions)
-        profile_rows: List[Dict] = []
-
-        for region in regions:
-            cw = sess.client("cloudwatch", region_name=region, config=CFG)
-
-            # ---------- existing EC2 utilization (running only) ----------
-            try:
-                running_instances = list_running_instances(sess, region)
-            except ClientError as e:
-                print(f"[{profile}/{region}] describe_instances (running) failed: {e}", file=sys.stderr)
-                running_instances = []
-
-            for inst in running_instances:
-                iid = inst["InstanceId"]
-                itype = inst["InstanceType"]
-                name = inst.get("Name", "")
-
-                # CPU
-                cpu_points = []
-                try:
-                    cpu_points = fetch_cpu_points_5m(cw, iid, start, end)
-                except ClientError as e:
-                    print(f"[{profile}/{region}/{iid}] CPUUtilization error: {e}", file=sys.stderr)
-                cpu_avg = mean(cpu_points)
-                cpu_p95_ = p95(cpu_points)
-
-                # Network
-                net_mb_day = 0.0
-                try:
-                    net_mb_day = fetch_network_daily_mb(cw, iid, start, end)
-                except ClientError as e:
-                    print(f"[{profile}/{region}/{iid}] NetworkIn/Out error: {e}", file=sys.stderr)
-
-                # Credits
-                credit_min = None
-                if is_t_family(itype):
-                    try:
-                        credit_min = fetch_cpu_credit_min(cw, iid, start, end)
-                    except ClientError as e:
-                        print(f"[{profile}/{region}/{iid}] CPUCreditBalance error: {e}", file=sys.stderr)
-
-                category, note = categorize(cpu_avg, cpu_p95_, net_mb_day)
-                row = {
-                    "account_id": account_id,
-                    "account_name": account_name,
-                    "region": region,
-                    "instance_id": iid,
-                    "name": name,
-                    "type": itype,
-                    "cpu_avg_pct": round(cpu_avg, 2),
-                    "cpu_p95_pct": round(cpu_p95_, 2),
-                    "net_mb_per_day": round(net_mb_day, 2),
-                    "cpu_credit_balance": "" if credit_min is None else round(credit_min, 2),
-                    "category": category,
-                    "note": note
-                }
-                profile_rows.append(row)
-                all_rows.append(row)
-                cat_counter[category] += 1
-
-            # ---------- NEW: infra complements ----------
-            # build instance state map once per region to support EBS/EIP summaries
-            try:
-                inst_map = list_instances_all_states(sess, region)
-            except ClientError as e:
-                print(f"[{profile}/{region}] describe_instances (all states) failed: {e}", file=sys.stderr)
-                inst_map = {}
-
-            # state summary
-            for iid, meta in inst_map.items():
-                inst_state_summary[meta.get("state","unknown")] += 1
-
-            # EBS volumes
-            if not args.skip_ebs:
-                try:
-                    vol_rows = collect_ebs_volumes(sess, region, inst_map)
-                    # decorate account info
-                    for r in vol_rows:
-                        r.update({"account_id": account_id, "account_name": account_name})
-                    ebs_rows_all.extend(vol_rows)
-                except ClientError as e:
-                    print(f"[{profile}/{region}] describe_volumes failed: {e}", file=sys.stderr)
-
-            # Snapshots (needs existing volume IDs for 'is_volume_present')
-            if not args.skip_snapshots:
-                existing_vol_ids = {r["volume_id"] for r in ebs_rows_all if r.get("volume_id")}
-                try:
-                    snap_rows = collect_snapshots(sess, region, existing_vol_ids, args.snap_old_days)
-                    for r in snap_rows:
-                        r.update({"account_id": account_id, "account_name": account_name})
-                    snap_rows_all.extend(snap_rows)
-                except ClientError as e:
-                    print(f"[{profile}/{region}] describe_snapshots failed: {e}", file=sys.stderr)
-
-            # EIPs
-            if not args.skip_eips:
-                addrs, per_inst = collect_eips(sess, region)
-                for r in addrs:
-                    r.update({"account_id": account_id, "account_name": account_name})
-                for r in per_inst:
-                    r.update({"account_id": account_id, "account_name": account_name})
-                eip_rows_all.extend(addrs)
-                eip_per_inst_all.extend(per_inst)
-
-            # NAT Gateways
-            if not args.skip_nat:
-                try:
-                    nat_rows = collect_nat_gateways(sess, region, nat_start, end)
-                    for r in nat_rows:
-                        r.update({"account_id": account_id, "account_name": account_name})
-                    nat_rows_all.extend(nat_rows)
-                except ClientError as e:
-                    print(f"[{profile}/{region}] NAT collection failed: {e}", file=sys.stderr)
-
-        # write per-profile CSV (existing)
-        write_csv(os.path.join(outdir, f"ec2_{profile}.csv"), profile_rows, FIELD_ORDER)
+    # regions (of every profile) run concurrently; results are merged below in submission order
+    # (profile, then region), so every CSV keeps the serial run's row order
+    tasks: List[Tuple[str, Future]] = []
+    with ThreadPoolExecutor(max_workers=args.max_workers) as ex:
+        for profile in args.profiles:
+            sess = session_for_profile(profile)
+            account_id, _ = sts_whoami(sess)
+            account_name = sess.profile_name
+            for region in list_regions(sess, args.regions):
+                # own Session per task: client creation on a shared Session isn't thread-safe
+                tasks.append((profile, ex.submit(process_region, session_for_profile(profile), profile,
+                                                 account_id, account_name, region, args, start, end, nat_start)))
+
+        profile_rows: Dict[str, List[Dict]] = {profile: [] for profile in args.profiles}
+        for profile, fut in tasks:
+            res = fut.result()
+            profile_rows[profile].extend(res.rows)
+            all_rows.extend(res.rows)
+            cat_counter.update(res.categories)
+            inst_state_summary.update(res.states)
+            ebs_rows_all.extend(res.ebs)
+            snap_rows_all.extend(res.snapshots)
+            eip_rows_all.extend(res.eips)
+            eip_per_inst_all.extend(res.eip_per_instance)
+            nat_rows_all.extend(res.nat)
+
+    # write per-profile CSV (existing)
+    for profile, rows in profile_rows.items():
+        write_csv(os.path.join(outdir, f"ec2_{profile}.csv"), rows, FIELD_ORDER)
 
     # write merged (existing)
     write_csv(os.path.join(outdir, "ec2_all_profiles.csv"), all_rows, FIELD_ORDER)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest import mock
+
+from botocore.config import Config as BotoConfig
+
+from scripts.common import aws_common
+
+
+class FakeSession:
+    """Session stand-in: counts client() calls; the sts client answers with this session's account."""
+
+    def __init__(self, profile_name: str, account: str):
+        self.profile_name = profile_name
+        self.account = account
+        self.clients = 0
+
+    def client(self, service, region_name=None, config=None):
+        self.clients += 1
+        return FakeClient(service, region_name, config, self.account)
+
+
+class FakeClient:
+    def __init__(self, service, region, config, account):
+        self.service, self.region, self.config, self.account = service, region, config, account
+
+    def get_caller_identity(self):
+        return {"Account": self.account, "Arn": f"arn:aws:iam::{self.account}:user/x"}
+
+
+class GetClientCacheTest(unittest.TestCase):
+    def setUp(self):
+        aws_common._client_cache.clear()
+
+    def test_equal_configs_built_separately_share_a_client(self):
+        sess = FakeSession("p", "111")
+        a = aws_common.get_client(sess, "cloudwatch", "us-east-1", BotoConfig(retries={"max_attempts": 3}))
+        b = aws_common.get_client(sess, "cloudwatch", "us-east-1", BotoConfig(retries={"max_attempts": 3}))
+        self.assertIs(a, b)
+        self.assertEqual(sess.clients, 1)
+
+    def test_default_config_matches_cfg(self):
+        sess = FakeSession("p", "111")
+        self.assertIs(aws_common.get_client(sess, "mq", "eu-west-1"),
+                      aws_common.get_client(sess, "mq", "eu-west-1", aws_common.CFG))
+
+    def test_key_includes_config_values_region_service_and_session(self):
+        sess, other = FakeSession("p", "111"), FakeSession("p", "222")
+        base = aws_common.get_client(sess, "cloudwatch", "us-east-1", aws_common.CFG)
+        self.assertIsNot(base, aws_common.get_client(
+            sess, "cloudwatch", "us-east-1", aws_common.with_pool_size(aws_common.CFG, 64)))
+        self.assertIsNot(base, aws_common.get_client(sess, "cloudwatch", "us-west-2", aws_common.CFG))
+        self.assertIsNot(base, aws_common.get_client(sess, "logs", "us-east-1", aws_common.CFG))
+        self.assertIsNot(base, aws_common.get_client(other, "cloudwatch", "us-east-1", aws_common.CFG))
+
+
+class StsWhoamiCacheTest(unittest.TestCase):
+    def setUp(self):
+        aws_common._client_cache.clear()
+        aws_common._whoami_cache.clear()
+
+    def test_same_profile_name_different_sessions_are_not_shared(self):
+        a, b = FakeSession("default", "111"), FakeSession("default", "222")
+        self.assertEqual(aws_common.sts_whoami(a)[0], "111")
+        self.assertEqual(aws_common.sts_whoami(b)[0], "222")
+
+    def test_repeat_calls_reuse_the_identity(self):
+        sess = FakeSession("p", "111")
+        self.assertEqual(aws_common.sts_whoami(sess), aws_common.sts_whoami(sess))
+        self.assertEqual(sess.clients, 1)
+
+
+class SessionForProfileCacheTest(unittest.TestCase):
+    def test_one_session_per_profile(self):
+        aws_common.session_for_profile.cache_clear()
+        try:
+            with mock.patch.object(aws_common.boto3, "Session", side_effect=lambda profile_name: object()) as ctor:
+                a = aws_common.session_for_profile("prod")
+                self.assertIs(a, aws_common.session_for_profile("prod"))
+                self.assertIsNot(a, aws_common.session_for_profile("dev"))
+            self.assertEqual(ctor.call_count, 2)
+        finally:
+            aws_common.session_for_profile.cache_clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
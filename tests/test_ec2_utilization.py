@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from scripts.reviews.ec2_utilization import run
+
+
+class FakeCloudWatch:
+    """GetMetricData stand-in: one datapoint per query; raises for chunks holding a failing instance."""
+
+    def __init__(self, failing_instance: str):
+        self.failing_instance = failing_instance
+        self.calls = []
+
+    def get_paginator(self, name):
+        assert name == "get_metric_data"
+        return self
+
+    def paginate(self, MetricDataQueries, StartTime, EndTime, **kwargs):
+        ids = {q["MetricStat"]["Metric"]["Dimensions"][0]["Value"] for q in MetricDataQueries}
+        self.calls.append(ids)
+        if self.failing_instance in ids:
+            raise ClientError({"Error": {"Code": "Throttling"}}, "GetMetricData")
+        yield {"MetricDataResults": [{"Id": q["Id"], "Timestamps": [StartTime], "Values": [50.0]}
+                                     for q in MetricDataQueries]}
+
+
+def instances(n: int):
+    return [{"InstanceId": f"i-{i:04d}", "InstanceType": "m5.large", "Name": f"n{i}"} for i in range(n)]
+
+
+class FetchInstanceMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.end = run.utc_now()
+        self.start = self.end - timedelta(days=14)
+
+    def test_failed_chunk_only_drops_its_instances(self):
+        insts = instances(400)  # 3 queries each: 166 instances per 500-query chunk
+        cw = FakeCloudWatch(failing_instance="i-0200")
+        with mock.patch("sys.stderr"):
+            metrics = run.fetch_instance_metrics(cw, insts, self.start, self.end)
+
+        self.assertEqual(len(cw.calls), 3)
+        failed = next(ids for ids in cw.calls if "i-0200" in ids)
+        self.assertEqual(set(metrics), {i["InstanceId"] for i in insts} - failed)
+        self.assertEqual(metrics["i-0000"]["cpu"], [50.0])
+
+    def test_instance_queries_never_span_chunks(self):
+        # T-family instances add CPUCreditBalance: 4 queries each, 125 per chunk
+        insts = [dict(i, InstanceType="t3.micro") for i in instances(130)]
+        cw = FakeCloudWatch(failing_instance="")
+        run.fetch_instance_metrics(cw, insts, self.start, self.end)
+
+        self.assertEqual([len(ids) for ids in cw.calls], [125, 5])
+
+    def test_process_region_marks_failed_chunk_unknown(self):
+        insts = instances(400)
+        cw = FakeCloudWatch(failing_instance="i-0200")
+        sess = SimpleNamespace(client=lambda *a, **k: cw)
+        args = SimpleNamespace(skip_ebs=True, skip_snapshots=True, skip_eips=True, skip_nat=True)
+        with mock.patch.object(run, "list_running_instances", return_value=insts), \
+                mock.patch.object(run, "list_instances_all_states", return_value={}), \
+                mock.patch("sys.stderr"):
+            res = run.process_region(sess, "p", "1", "acct", "us-east-1", args,
+                                     self.start, self.end, self.start)
+
+        failed = next(ids for ids in cw.calls if "i-0200" in ids)
+        unknown = {r["instance_id"] for r in res.rows if r["category"] == "Unknown"}
+        self.assertEqual(unknown, failed)
+        self.assertEqual(res.categories["Unknown"], len(failed))
+        row = next(r for r in res.rows if r["instance_id"] == "i-0200")
+        self.assertEqual(row["cpu_avg_pct"], "")
+        self.assertNotEqual(next(r for r in res.rows if r["instance_id"] == "i-0000")["category"], "Unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()